@@ -0,0 +1,50 @@
+"""워크시트 로드: 한 번에 get_all_values vs 구간 분할 동시 요청(fetch_columns).
+
+가짜 워크시트에 요청당 지연과 행당 전송 시간을 흉내 내고, 일부 요청은 429 로
+실패시켜 재시도까지 확인한다. 두 방식의 결과가 같은지도 검사한다.
+
+    python -m benchmarks.bench_fetch [행 수]
+"""
+import sys
+import time
+
+from benchmarks.fakes import FakeWorksheet, sheet_values
+from benchmarks.synthetic import visit_sheet
+from core.sheets import fetch_columns
+
+
+class SlowWorksheet(FakeWorksheet):
+    # 응답 크기에 비례하는 전송 시간 (행당 20µs)
+    def get(self, range_name):
+        rows = super().get(range_name)
+        time.sleep(len(rows) * 20e-6)
+        return rows
+
+    def get_all_values(self):
+        rows = super().get_all_values()
+        time.sleep(len(rows) * 20e-6)
+        return rows
+
+
+def main(n: int = 200_000):
+    values = sheet_values(visit_sheet(n))
+    width = len(values[0])
+
+    ws = SlowWorksheet(values, latency=0.3)
+    t0 = time.perf_counter()
+    whole = ws.get_all_values()[1:]
+    t_whole = time.perf_counter() - t0
+
+    ws = SlowWorksheet(values, latency=0.3, fail_rate=0.1)
+    t0 = time.perf_counter()
+    columns = fetch_columns(ws, width, start_row=2, chunk_rows=20_000, max_workers=4)
+    t_chunked = time.perf_counter() - t0
+
+    assert [list(r) for r in zip(*columns)] == [r + [""] * (width - len(r)) for r in whole]
+    print(f"rows={n:,}, 결과 일치, 요청 {ws.calls}회 (429 재시도 포함)")
+    print(f"get_all_values : {t_whole:6.2f}s")
+    print(f"fetch_columns  : {t_chunked:6.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
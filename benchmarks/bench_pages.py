@@ -0,0 +1,261 @@
+"""두 페이지의 단계별 시간과 최대 메모리 (진료 기록 규모별).
+
+합성 시트를 로컬 공급원 파일(Parquet)로 써 두고, 환자정보.py 와 pages/지역장악도.py 가
+한 번 rerun 할 때 거치는 단계(로드, 전처리, 파생 구조, 필터, 집계, 차트 스펙, 지도, 전체 지역
+순위, 행정동 장악도 지도)를 페이지와 같은 함수로 차례로 실행한다. tracemalloc 은 파이썬
+객체 할당마다 부하가 커서 시간을 왜곡하므로, 시간은 추적 없이 한 번, 메모리는 tracemalloc 을
+켜고 한 번 더 돌려 단계별 최대치(그 단계가 새로 잡은 바이트)를 잰다. 규모마다 프로세스 최대
+RSS 도 적는다.
+어느 단계에서 MemoryError 로 실패하면 그 규모는 거기서 멈추고 다음 규모로 넘어간다.
+
+    python -m benchmarks.bench_pages [규모 ...] [--no-trace] [--csv 결과.csv]
+
+규모 기본값은 10k 100k 1M 10M. --no-trace 는 메모리 측정(두 번째 실행)을 건너뛴다.
+duckdb 가 설치돼 있으면 같은 조건의 SQL 엔진(query_backend=duckdb) 단계도 잰다.
+"""
+import argparse
+import csv
+import gc
+import importlib.util
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+import altair as alt
+import folium
+from folium.plugins import FastMarkerCluster
+
+from benchmarks.synthetic import write_exports
+from core.boundaries import Boundaries, region_key
+from core.charts import growth_chart, trend_chart, yoy_chart
+from core.cube import (
+    build_visit_cube, kpis, monthly_growth, slice_cube, weekday_hour_counts
+)
+from core.distinct import DistinctPatientIndex
+from core.engine import SqlEngine
+from core.filters import visit_rows
+from core.geo import grid_cells, patient_points
+from core.penetration import ActivityTable, population_long
+from core.patients import PatientTable
+from core.preprocess import preprocess_population, preprocess_visits
+from core.regions import RegionIndex
+from core.schema import apply_schema
+from core.timeseries import TimeSeriesEngine
+from core.sources import LocalSource
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+VISIT_SHEET = "Sheet1"
+POPULATION_SHEET = "연령별인구현황"
+
+
+class Stages:
+    """단계별 (이름, 초, 최대 메모리 바이트) 기록."""
+
+    def __init__(self, trace: bool):
+        self.trace = trace
+        self.rows = []
+
+    def run(self, name, fn, *args):
+        gc.collect()
+        if self.trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        result = fn(*args)
+        seconds = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] - base if self.trace else None
+        self.rows.append((name, seconds, peak))
+        if not self.trace:
+            # 진행 상황 (메모리 부족으로 프로세스가 죽어도 어디까지 갔는지 보이게)
+            print(f"  {name} {seconds:.2f}s", file=sys.stderr, flush=True)
+        return result
+
+
+# --- 환자정보.py 단계 -------------------------------------------------------
+
+def trend_spec(engine, ages, start, end):
+    return trend_chart(engine.series(ages, "전체").moving_averages(start, end)).to_dict()
+
+
+def yoy_spec(engine, start, end):
+    return yoy_chart(engine.series().year_over_year(start, end)).to_dict()
+
+
+def monthly_spec(part, cube, start, end):
+    return growth_chart(monthly_growth(part, cube, start, end)).to_dict()
+
+
+def heat_spec(part):
+    heat = weekday_hour_counts(part)
+    return alt.Chart(heat).mark_rect().encode(x='진료시간대:O', y='요일:O', color='count:Q').to_dict()
+
+
+def grid_map(points, zoom=10):
+    cells = grid_cells(points, zoom)
+    m = folium.Map(location=[37.5665, 126.9780], zoom_start=7)
+    max_count = cells['count'].max() if len(cells) else 1
+    for lat, lon, count in cells.itertuples(index=False, name=None):
+        folium.CircleMarker([lat, lon], radius=4 + 16 * (count / max_count) ** 0.5,
+                            weight=0, fill=True, tooltip=f"{count:,}명").add_to(m)
+    return m.get_root().render()
+
+
+def cluster_map(points):
+    m = folium.Map(location=[37.5665, 126.9780], zoom_start=7)
+    FastMarkerCluster(list(points.astype(float).itertuples(index=False, name=None))).add_to(m)
+    return m.get_root().render()
+
+
+def visit_page(stages, path):
+    source = LocalSource(path)
+    raw, _ = stages.run("load: 진료 기록", source.read, VISIT_SHEET)
+    df = stages.run("preprocess: 진료 기록", lambda r: apply_schema(preprocess_visits(r))[0], raw)
+    del raw
+    cube = stages.run("build: 집계 큐브", build_visit_cube, df)
+    engine = stages.run("build: 시계열 엔진", TimeSeriesEngine, cube)
+    index = stages.run("build: 고유 환자 인덱스", DistinctPatientIndex, df)
+
+    # 사이드바 기본값과 같은 조건 (전체 기간, 전체 연령대, 성별 전체)
+    start, end = df['진료일자'].min().date(), df['진료일자'].max().date()
+    ages = df['연령대'].cat.categories.tolist()
+    part = stages.run("filter: 큐브", slice_cube, cube, start, end, ages, "전체")
+    rows = stages.run("filter: 진료 기록 행 번호", visit_rows, df, start, end, ages, "전체")
+    stages.run("agg: KPI", lambda: (index.count(start, end, ages, "전체"), kpis(part)))
+    stages.run("agg: KPI (HLL 근사)", index.count, start, end, ages, "전체", True)
+    stages.run("chart: 일별 추이", trend_spec, engine, ages, start, end)
+    stages.run("chart: 전년 동기", yoy_spec, engine, start, end)
+    stages.run("chart: 월간 성장률", monthly_spec, part, cube, start, end)
+    stages.run("chart: 요일×시간대", heat_spec, part)
+    points = stages.run("map: 환자 좌표", patient_points, df, rows)
+    stages.run("map: 격자 집계", grid_map, points)
+    stages.run("map: 마커 클러스터", cluster_map, points)
+    return df
+
+
+# --- pages/지역장악도.py 단계 -----------------------------------------------
+
+def penetration_spec(merge, regions, months):
+    sel = merge.loc[regions.mask(merge['지역코드'], "전체", "전체", "전체")]
+    agg = sel.groupby('연령대', as_index=False)[['인구수', '환자수']].sum()
+    agg['장악도(%)'] = (agg['환자수'] / agg['인구수'] * 100).round(4)
+    bar = alt.Chart(agg).mark_bar().encode(x='연령대:O', y='장악도(%):Q')
+    text = alt.Chart(agg).mark_text().encode(x='연령대:O', y='장악도(%):Q', text='장악도(%):Q')
+    return (bar + text).to_dict()
+
+
+def choropleth_map(boundaries, ranking, metric, zoom=9):
+    dongs = ranking[ranking['단계'] == '행정동']
+    names = dongs['시/도'] + ' ' + dongs['시/군/구'] + ' ' + dongs['행정동']
+    dongs = dongs.assign(key=names.map(region_key))
+    geo = boundaries.feature_collection({k: {'값': v} for k, v in zip(dongs['key'], dongs[metric])}, zoom)
+    m = folium.Map(location=[36.5, 127.8], zoom_start=7, tiles="cartodbpositron")
+    folium.Choropleth(geo_data=geo, data=dongs, columns=['key', metric],
+                      key_on='feature.properties.key', fill_color='YlOrRd').add_to(m)
+    return m.get_root().render()
+
+
+def penetration_page(stages, path, visits):
+    raw, _ = stages.run("load: 인구현황", LocalSource(path).read, POPULATION_SHEET)
+    pop = stages.run("preprocess: 인구현황", preprocess_population, raw)
+    regions = stages.run("build: 지역 인덱스", RegionIndex, pop, visits)
+    pop = pop.assign(지역코드=regions.encode(pop))
+    pop_long = stages.run("build: 인구 긴 테이블", population_long, pop)
+    patients = stages.run("build: 환자 차원 테이블", PatientTable, visits, regions)
+    # 조건 없는 지도(환자정보 기본 화면)는 차원 테이블의 좌표를 그대로 쓴다
+    stages.run("map: 환자 좌표 (차원 테이블)", patients.points)
+    activity = stages.run("build: 장악도 테이블", ActivityTable, patients.frame, date.today(), len(regions.keys))
+    months = 12
+    merge = stages.run("agg: 장악도", activity.penetration, pop_long, months)
+    stages.run("agg: 장악도 KPI", lambda: (activity.count(), activity.count(months)))
+    stages.run("chart: 연령대 장악도", penetration_spec, merge, regions, months)
+    ranking = stages.run("agg: 전체 지역 순위", activity.rollup, pop, pop_long, regions, months)
+    boundaries = stages.run("load: 행정동 경계", Boundaries, Path(path) / "boundaries.geojson")
+    # 지도 기본 상세도(줌 9) 단순화는 처음 한 번, 이후 같은 줌은 캐시
+    stages.run("map: 경계 단순화 (줌 9)", boundaries.geometries, 9)
+    stages.run("map: 행정동 장악도 지도", choropleth_map, boundaries, ranking, '장악도(%)')
+    if importlib.util.find_spec("duckdb") is not None:
+        sql_stages(stages, visits, patients, pop_long, months)
+
+
+# --- query_backend=duckdb ----------------------------------------------------
+
+def sql_stages(stages, visits, patients, pop_long, months):
+    engine = stages.run("build: SQL 엔진 (Parquet)", SqlEngine, 1, visits, patients.frame, pop_long)
+    try:
+        start, end = visits['진료일자'].min().date(), visits['진료일자'].max().date()
+        ages = visits['연령대'].cat.categories.tolist()
+        stages.run("sql: KPI", engine.kpis, start, end, ages, "전체")
+        stages.run("sql: 일별 추이", engine.series, ages, "전체")
+        stages.run("sql: 월간 성장률", engine.monthly_growth, start, end, ages, "전체")
+        stages.run("sql: 요일×시간대", engine.weekday_hour_counts, start, end, ages, "전체")
+        stages.run("sql: 환자 좌표", engine.points, start, end, ages, "전체")
+        stages.run("sql: 장악도", engine.penetration, date.today(), months)
+    finally:
+        engine.close()
+
+
+def run_pages(path, trace):
+    stages = Stages(trace)
+    try:
+        visits = visit_page(stages, path)
+        penetration_page(stages, path, visits)
+        error = None
+    except MemoryError as e:
+        error = f"MemoryError {e}"
+    return stages.rows, error
+
+
+def bench(n, trace):
+    """[(단계, 초, 최대 메모리)] 와 실패 메시지."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_exports(tmp, n, visit_sheet_name=VISIT_SHEET, population_sheet_name=POPULATION_SHEET)
+        gc.collect()
+        rows, error = run_pages(tmp, trace=False)
+        if trace and error is None:
+            tracemalloc.start()
+            try:
+                peaks, error = run_pages(tmp, trace=True)
+            finally:
+                tracemalloc.stop()
+            peaks = dict((name, peak) for name, _, peak in peaks)
+            rows = [(name, seconds, peaks.get(name)) for name, seconds, _ in rows]
+    return rows, error
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", default=list(SIZES))
+    parser.add_argument("--no-trace", action="store_true")
+    parser.add_argument("--csv")
+    args = parser.parse_args()
+
+    trace = not args.no_trace
+    results = []
+    for label in args.sizes:
+        n = SIZES.get(label) or int(label)
+        rows, error = bench(n, trace)
+        total = sum(s for _, s, _ in rows)
+        print(f"\n== 진료 기록 {n:,}건 (합계 {total:.2f}s) ==")
+        for name, seconds, peak in rows:
+            mem = f"{peak / 2**20:9.1f}MB" if peak is not None else ""
+            print(f"{name:28s} {seconds * 1000:10.1f}ms {mem}")
+            results.append((n, name, seconds, peak))
+        if error:
+            print(f"!! 여기서 실패: {error}")
+            results.append((n, "실패", None, None))
+        # 리눅스에서 ru_maxrss 단위는 KB
+        print(f"프로세스 최대 RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.0f}MB")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["visits", "stage", "seconds", "peak_bytes"])
+            writer.writerows(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""인구현황 주소 분리: 기존 행별 apply(split_address) vs 벡터화 split_addresses.
+
+시간만 비교한다. 기존 함수와 주소 표본은 tests/legacy.py 에 있고, 결과가 같은지는
+tests/test_split_address.py 에서 검사한다.
+
+    python -m benchmarks.bench_split_address [반복 수]
+"""
+import sys
+import time
+
+from core.preprocess import split_addresses
+from tests.legacy import sample, split_address
+
+
+def main(repeat: int = 20, n: int = 3500):
+    addr = sample(n)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        addr.apply(split_address)
+    t_old = (time.perf_counter() - t0) / repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        split_addresses(addr)
+    t_new = (time.perf_counter() - t0) / repeat
+    print(f"rows={n:,}")
+    print(f"apply(split_address): {t_old * 1000:8.1f}ms")
+    print(f"split_addresses     : {t_new * 1000:8.1f}ms  (x{t_old / t_new:.0f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
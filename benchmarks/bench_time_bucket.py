@@ -0,0 +1,40 @@
+"""진료시간대 계산: 기존 행별 apply(categorize_time) vs 벡터화 hour_bucket.
+
+    python -m benchmarks.bench_time_bucket [행 수]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.preprocess import hour_bucket
+from tests.legacy import categorize_time
+
+
+def sample(n: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    hms = rng.integers(8, 20, n) * 10000 + rng.integers(0, 60, n) * 100 + rng.integers(0, 60, n)
+    s = pd.Series(hms, dtype='Int32')
+    s[rng.random(n) < 0.01] = pd.NA
+    return s
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(n: int = 1_000_000):
+    hms = sample(n)
+    old, t_old = timed(lambda s: s.apply(categorize_time), hms)
+    new, t_new = timed(hour_bucket, hms)
+    assert (old == new.astype(str)).all(), "결과 불일치"
+    print(f"rows={n:,}")
+    print(f"apply(categorize_time): {t_old:8.3f}s")
+    print(f"hour_bucket           : {t_new:8.3f}s  (x{t_old / t_new:.0f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
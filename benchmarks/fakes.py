@@ -0,0 +1,89 @@
+"""네트워크 없이 쓰는 가짜 gspread 워크시트.
+
+실제 API 처럼 값은 문자열, 행 끝 빈 칸과 범위 끝 빈 행은 잘라서 돌려준다.
+요청마다 지연(latency)을 주고, fail_rate 확률로 429 APIError 를 던질 수 있다.
+"""
+import random
+import re
+import threading
+import time
+
+import pandas as pd
+from gspread.exceptions import APIError
+from gspread.utils import a1_to_rowcol
+
+_RANGE = re.compile(r"^([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$")
+
+
+class _Response:
+    def __init__(self, code, message):
+        self._body = {"error": {"code": code, "message": message, "status": ""}}
+        self.text = message
+
+    def json(self):
+        return self._body
+
+
+def sheet_values(df: pd.DataFrame):
+    """DataFrame → 시트 표시 값(헤더 + 문자열 행). NaN 은 빈 칸."""
+    body = df.astype(object).where(df.notna(), "").astype(str).values.tolist()
+    return [list(map(str, df.columns))] + body
+
+
+class FakeWorksheet:
+    def __init__(self, values, title="Sheet1", latency=0.0, fail_rate=0.0, extra_rows=1000, seed=0):
+        self.values = values
+        self.title = title
+        self.latency = latency
+        self.fail_rate = fail_rate
+        # 실제 시트처럼 데이터 아래에 빈 행이 남아 있는 그리드
+        self.extra_rows = extra_rows
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs):
+        return cls(sheet_values(df), **kwargs)
+
+    @property
+    def row_count(self):
+        return len(self.values) + self.extra_rows
+
+    @property
+    def col_count(self):
+        return len(self.values[0]) if self.values else 0
+
+    def _request(self):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.fail_rate
+        time.sleep(self.latency)
+        if fail:
+            raise APIError(_Response(429, "Quota exceeded (fake)"))
+
+    def row_values(self, row):
+        self._request()
+        return self._trim_row(self.values[row - 1]) if row <= len(self.values) else []
+
+    def get_all_values(self):
+        self._request()
+        return [list(r) for r in self.values]
+
+    def get(self, range_name):
+        self._request()
+        m = _RANGE.match(range_name)
+        first_row = int(m.group(2))
+        last_row = int(m.group(4)) if m.group(4) else self.row_count
+        last_col = a1_to_rowcol(f"{m.group(3) or m.group(1)}1")[1]
+        rows = [self._trim_row(r[:last_col]) for r in self.values[first_row - 1:last_row]]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    @staticmethod
+    def _trim_row(row):
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        return row
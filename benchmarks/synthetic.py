@@ -0,0 +1,173 @@
+"""실제 시트와 같은 스키마의 합성 데이터.
+
+- visit_sheet(n): 진료 기록 시트 (Sheet1). 진료일자 YYYYMMDD, 진료시간 HHMMSS,
+  시/도는 '경기' 같은 약칭, 좌표는 y=위도 x=경도, 일부 환자는 주소/좌표가 빈 칸
+- population_sheet(): 연령별인구현황 시트. 행정기관 주소 + 연령대별 인구수는
+  '1,234' 처럼 천 단위 구분 문자열
+- boundaries(): 행정동 경계 GeoJSON (adm_nm 은 특례시 구를 붙여 쓰는 공개 경계 파일 형식)
+- write_exports(path, n): 두 시트를 로컬 공급원(core.sources.LocalSource) 형식 파일로,
+  경계는 boundaries.geojson 으로
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.preprocess import AGE_LABELS, province_map
+
+# (시/도 약칭, 시/군/구 목록, 중심 위도, 중심 경도)
+_PROVINCES = [
+    ("서울", ["강남구", "서초구", "송파구", "마포구", "종로구"], 37.55, 126.99),
+    ("경기", ["시흥시", "수원시 영통구", "수원시 장안구", "성남시 분당구", "부천시 원미구", "안산시 단원구"], 37.35, 126.95),
+    ("인천", ["남동구", "연수구", "부평구"], 37.45, 126.70),
+    ("부산", ["해운대구", "사하구"], 35.15, 129.05),
+    ("대전", ["서구", "유성구"], 36.35, 127.38),
+    ("충남", ["천안시 서북구", "아산시"], 36.80, 127.10),
+]
+_SEJONG = ("세종특별자치시", 36.48, 127.29)
+DONGS_PER_CITY = 12
+
+
+def regions() -> pd.DataFrame:
+    """(시/도 약칭, 시/도, 시/군/구, 행정동, 위도, 경도) 목록."""
+    rows = []
+    for short, cities, lat, lon in _PROVINCES:
+        for i, city in enumerate(cities):
+            base = city.split()[-1][:-1]
+            for k in range(1, DONGS_PER_CITY + 1):
+                rows.append((short, province_map[short], city, f"{base}{k}동",
+                             lat + 0.05 * i + 0.004 * k, lon + 0.04 * i - 0.003 * k))
+    name, lat, lon = _SEJONG
+    for k in range(1, DONGS_PER_CITY + 1):
+        rows.append((name, name, "", f"세종{k}동", lat + 0.004 * k, lon))
+    return pd.DataFrame(rows, columns=["약칭", "시/도", "시/군/구", "행정동", "위도", "경도"])
+
+
+def visit_sheet(n: int, seed: int = 0, end=None, years: int = 3) -> pd.DataFrame:
+    """진료 기록 n건. 환자 한 명당 평균 4회 내원, 최근 `years` 년에 걸쳐 분포."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    n_days = 365 * years
+    n_patients = max(n // 4, 1)
+
+    # 환자 속성 (환자별로 고정)
+    reg = regions()
+    home = rng.integers(0, len(reg), n_patients)
+    birth_age = rng.integers(0, 95, n_patients)
+    sex = rng.choice(np.array(["남", "여"]), n_patients)
+    no_address = rng.random(n_patients) < 0.15
+    no_coords = rng.random(n_patients) < 0.10
+
+    patient = rng.integers(0, n_patients, n)
+    # 날짜는 정렬된 순서 (시트에 날짜순으로 쌓인다), 일요일은 휴진
+    day = np.sort(rng.integers(0, n_days, n))
+    dates = end - pd.to_timedelta(n_days - 1 - day, unit="D")
+    sunday = dates.dayofweek == 6
+    dates = dates.where(~sunday, dates - pd.Timedelta(days=1))
+    hour = rng.choice(np.arange(8, 20), n, p=np.r_[[6, 10, 12, 10, 5, 8, 10, 10, 9, 8, 7, 5]] / 100)
+    time_ = hour * 10000 + rng.integers(0, 60, n) * 100 + rng.integers(0, 60, n)
+
+    r = reg.iloc[home[patient]].reset_index(drop=True)
+    blank_addr = no_address[patient]
+    blank_xy = no_coords[patient]
+    # 첫 내원은 신환, 이후는 재진
+    first = ~pd.Series(patient).duplicated().to_numpy()
+
+    return pd.DataFrame({
+        "환자번호": patient + 100000,
+        # YYYYMMDD 정수 (strftime 대신 산술로: 천만 행에서도 빠르게)
+        "진료일자": (dates.year * 10000 + dates.month * 100 + dates.day).astype("int64"),
+        "진료시간": time_,
+        "나이": np.minimum(birth_age[patient] + day // 365, 104),
+        "성별": sex[patient],
+        "초/재진": np.where(first, "신환", "재진"),
+        "시/도": np.where(blank_addr, "", r["약칭"]),
+        "시/군/구": np.where(blank_addr, "", r["시/군/구"]),
+        "행정동": np.where(blank_addr, "", r["행정동"]),
+        "x": np.where(blank_xy, np.nan, r["경도"] + rng.normal(0, 0.003, n)).round(6),
+        "y": np.where(blank_xy, np.nan, r["위도"] + rng.normal(0, 0.003, n)).round(6),
+    })
+
+
+def population_sheet(seed: int = 0) -> pd.DataFrame:
+    """행정동별 연령대 인구 (시/도 합계 행 포함)."""
+    rng = np.random.default_rng(seed)
+    reg = regions()
+    address = np.where(
+        reg["시/군/구"] == "",
+        reg["시/도"] + " " + reg["행정동"],
+        reg["시/도"] + " " + reg["시/군/구"] + " " + reg["행정동"],
+    )
+    counts = rng.integers(200, 4000, (len(reg), len(AGE_LABELS)))
+    fmt = np.vectorize("{:,}".format)
+    df = pd.DataFrame(fmt(counts), columns=AGE_LABELS)
+    df.insert(0, "행정기관", address)
+    df.insert(1, "행정기관코드", np.arange(len(reg)) + 1100000000)
+    df.insert(2, "총 인구수", counts.sum(axis=1))
+    df.insert(3, "연령구간인구수", 10)
+    # 실제 시트처럼 시/도 합계 행 (주소가 한 칸이라 분리 규칙에서 빠진다)
+    totals = pd.DataFrame(
+        [[p, 0, counts[mask].sum()] + list(fmt(counts[mask].sum(axis=0)))
+         for p in sorted(set(reg["시/도"])) for mask in [(reg["시/도"] == p).to_numpy()]],
+        columns=["행정기관", "행정기관코드", "총 인구수"] + AGE_LABELS,
+    )
+    totals["연령구간인구수"] = 10
+    return pd.concat([totals, df], ignore_index=True)[df.columns]
+
+
+def boundaries(vertices: int = 64) -> dict:
+    """행정동마다 중심을 둘러싼 타원 하나 (이웃 행정동과 겹치지 않는 크기)."""
+    reg = regions()
+    angle = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    features = []
+    for province, city, dong, lat, lon in reg[["시/도", "시/군/구", "행정동", "위도", "경도"]].itertuples(index=False):
+        ring = np.column_stack([lon + 0.0014 * np.cos(angle), lat + 0.0019 * np.sin(angle)]).round(6).tolist()
+        name = " ".join(part for part in (province, city.replace(" ", ""), dong) if part)
+        features.append({
+            "type": "Feature",
+            "properties": {"adm_nm": name},
+            "geometry": {"type": "Polygon", "coordinates": [ring + ring[:1]]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def write_exports(path, n: int, fmt: str = "parquet", seed: int = 0, chunk: int = 1_000_000,
+                  visit_sheet_name: str = "Sheet1", population_sheet_name: str = "연령별인구현황"):
+    """<path>/<시트 이름>.<fmt> 두 개를 쓴다 (fmt: parquet, csv). 빈 칸은 빈 문자열.
+
+    진료 기록은 chunk 건씩 만들어 바로 이어 쓴다 (천만 건도 메모리에 한 번에 올리지 않음).
+    덩어리마다 환자 집단이 달라 환자당 평균 내원 횟수는 그대로다.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+    end = pd.Timestamp.today().normalize()
+    target = path / f"{visit_sheet_name}.{fmt}"
+    writer = None
+    for i, start in enumerate(range(0, n, chunk)):
+        part = visit_sheet(min(chunk, n - start), seed=seed + i, end=end)
+        part["환자번호"] += i * (chunk // 4)
+        if fmt == "parquet":
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            writer = writer or pq.ParquetWriter(target, table.schema)
+            writer.write_table(table)
+        else:
+            part.to_csv(target, mode="a" if i else "w", header=not i, index=False, na_rep="")
+    if writer is not None:
+        writer.close()
+
+    pop = population_sheet(seed=seed)
+    target = path / f"{population_sheet_name}.{fmt}"
+    if fmt == "parquet":
+        pop.to_parquet(target, index=False)
+    else:
+        pop.to_csv(target, index=False)
+    with open(path / "boundaries.geojson", "w", encoding="utf-8") as f:
+        json.dump(boundaries(), f, ensure_ascii=False)
+    return path
@@ -0,0 +1 @@
+"""대시보드 페이지들이 공유하는 데이터 로드/가공 모듈."""
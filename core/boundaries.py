@@ -0,0 +1,160 @@
+"""행정동 경계(GeoJSON) 로드와 줌 레벨별 단순화.
+
+`boundary_path` 설정(저장소 루트 기준, 기본 data/boundaries.geojson)의 로컬 파일을
+읽는다. 행정동 이름 속성(`boundary_key`, 기본 adm_nm, 예: "경기도 수원시장안구 파장동")과
+인구현황 주소는 띄어쓰기가 다를 수 있어 공백을 모두 뺀 이름으로 맞춘다.
+
+전국 경계를 원래 해상도로 보내면 지도 HTML 이 수십 MB 가 되므로, 줌 레벨의 한 픽셀
+크기를 허용 오차로 단순화한 도형을 줌마다 한 번 만들어 둔다 (파일이 바뀌면 새로 읽음).
+단순화는 shapely(requirements.txt 에 포함)가 있을 때만 하고, 없으면 원래 도형을 그대로
+쓴다 (페이지가 `has_shapely()` 로 경고를 보여 줌).
+
+같은 경계로 행정동이 빈 진료 기록의 좌표가 어느 행정동 안에 있는지 찾는다
+(`backfill_regions`). 원래 해상도 도형의 STRtree 에 좌표를 한 번에 질의하고,
+좌표별 결과는 경계 객체에 캐시해 다음 갱신 때는 새 좌표만 질의한다.
+외부 지오코딩 서비스는 쓰지 않는다 (shapely 가 없으면 보완하지 않음).
+"""
+import importlib.util
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.config import ROOT_DIR, setting
+
+logger = logging.getLogger(__name__)
+
+
+def has_shapely() -> bool:
+    return importlib.util.find_spec("shapely") is not None
+
+
+def region_key(name: str) -> str:
+    """경계 이름과 인구현황 주소를 맞추는 키 (공백 제거)."""
+    return "".join(str(name).split())
+
+
+def tolerance(zoom: int) -> float:
+    """웹 지도 줌 레벨에서 한 픽셀의 크기(도)."""
+    return 360 / (256 * 2 ** zoom)
+
+
+class Boundaries:
+    def __init__(self, path: Path, key_property: str = "adm_nm"):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+        self.keys = [region_key((feature.get("properties") or {}).get(key_property, "")) for feature in features]
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        self._raw = [feature.get("geometry") for feature in features]
+        self._shapes = None
+        self._tree = None
+        self._by_zoom = {}
+        # 좌표(경도 + 위도j 복소수) → feature 번호 (-1: 어느 경계에도 없음)
+        self._located = {}
+        self._lock = threading.Lock()
+
+    def _geometries(self):
+        import shapely
+
+        if self._shapes is None:
+            self._shapes = shapely.from_geojson([json.dumps(g) if g else None for g in self._raw])
+        return self._shapes
+
+    def _simplified(self, zoom: int) -> list:
+        try:
+            import shapely
+            from shapely.geometry import mapping
+        except ImportError:
+            logger.info("shapely 가 없어 경계를 단순화하지 않습니다")
+            return self._raw
+        simplified = shapely.simplify(self._geometries(), tolerance(zoom), preserve_topology=True)
+        return [mapping(g) if g is not None else None for g in simplified]
+
+    def geometries(self, zoom: int) -> list:
+        """줌 레벨에 맞게 단순화한 GeoJSON 도형 (파일의 feature 순서)."""
+        with self._lock:
+            if zoom not in self._by_zoom:
+                self._by_zoom[zoom] = self._simplified(zoom)
+            return self._by_zoom[zoom]
+
+    def locate(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """좌표(x=경도, y=위도)마다 그 점을 포함하는 feature 번호. 없거나 shapely 가 없으면 -1."""
+        try:
+            import shapely
+        except ImportError:
+            logger.info("shapely 가 없어 좌표로 행정동을 찾지 않습니다")
+            return np.full(len(x), -1, dtype='int64')
+        codes, coords = pd.factorize(np.asarray(x, dtype='float64') + 1j * np.asarray(y, dtype='float64'))
+        with self._lock:
+            found = np.fromiter((self._located.get(c, -2) for c in coords), dtype='int64', count=len(coords))
+            new = np.flatnonzero(found == -2)
+            if len(new):
+                if self._tree is None:
+                    self._tree = shapely.STRtree(self._geometries())
+                points = shapely.points(coords.real[new], coords.imag[new])
+                point, feature = self._tree.query(points, predicate='intersects')
+                # 경계선 위의 점처럼 여러 경계에 걸리면 처음 것
+                point, first = np.unique(point, return_index=True)
+                found[new] = -1
+                found[new[point]] = feature[first]
+                self._located.update(zip(coords[new].tolist(), found[new].tolist()))
+        return found[codes]
+
+    def feature_collection(self, properties: dict, zoom: int) -> dict:
+        """properties: {region_key: 속성 dict}. 경계 파일에 있는 지역만 feature 로."""
+        geometries = self.geometries(zoom)
+        features = []
+        for key, props in properties.items():
+            i = self._positions.get(key)
+            if i is not None and geometries[i] is not None:
+                features.append({"type": "Feature", "properties": {"key": key, **props}, "geometry": geometries[i]})
+        return {"type": "FeatureCollection", "features": features}
+
+
+@st.cache_resource
+def _load(path: str, mtime: float, key_property: str) -> Boundaries:
+    return Boundaries(Path(path), key_property)
+
+
+def get_boundaries():
+    """설정된 경계 파일. 파일이 없으면 None."""
+    path = ROOT_DIR / setting("boundary_path", "data/boundaries.geojson")
+    if not path.exists():
+        return None
+    return _load(str(path), path.stat().st_mtime, setting("boundary_key", "adm_nm"))
+
+
+def backfill_regions(visits: pd.DataFrame, pop: pd.DataFrame, boundaries: Boundaries):
+    """행정동이 빈 진료 기록 중 좌표가 있는 행의 시/도, 시/군/구, 행정동, 행정기관을 채운다.
+
+    좌표가 든 경계와 같은 이름의 인구현황 행정동 값을 쓴다 (인구현황에 없는 경계는 건너뜀).
+    돌려주는 값: (새 프레임, 채운 행 수).
+    """
+    if boundaries is None:
+        return visits, 0
+    dong = visits['행정동']
+    x = pd.to_numeric(visits['x'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    y = pd.to_numeric(visits['y'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    rows = np.flatnonzero((dong.isna() | (dong == "")).to_numpy() & ~(np.isnan(x) | np.isnan(y)))
+    if not len(rows):
+        return visits, 0
+    # 경계 feature 번호 → 인구현황 행 번호 (-1: 인구현황에 없는 지역)
+    pop_rows = pd.Series(np.arange(len(pop)), index=pop['행정기관'].map(region_key).to_numpy())
+    pop_rows = pop_rows[~pop_rows.index.duplicated()]
+    feature_pop = np.append(pop_rows.reindex(boundaries.keys).fillna(-1).to_numpy(dtype='int64'), -1)
+    # 못 찾은 좌표(-1)는 맨 끝 칸(-1)으로
+    target = feature_pop[boundaries.locate(x[rows], y[rows])]
+    hit = target >= 0
+    if not hit.any():
+        return visits, 0
+    rows, source = rows[hit], pop.iloc[target[hit]]
+    filled = {}
+    for c in ['시/도', '시/군/구', '행정동', '행정기관']:
+        col = visits[c].to_numpy(dtype=object, copy=True)
+        col[rows] = source[c].to_numpy(dtype=object)
+        filled[c] = col
+    return visits.assign(**filled), len(rows)
@@ -0,0 +1,182 @@
+"""환자정보 페이지의 Altair 차트.
+
+레이어마다 같은 프레임을 넘기면 레이어 수만큼 직렬화되므로, 데이터는 레이어 묶음에
+한 번만 붙이고(레이어는 그 데이터를 상속) 시리즈가 여럿인 추이 차트는 넓은 프레임을
+보내 브라우저에서 transform_fold 로 펼친다. 조회 기간이 길어 점이 `chart_max_points`
+를 넘으면 LTTB(Largest-Triangle-Three-Buckets)로 모양(봉우리/골)을 살린 채 줄여서,
+기간과 상관없이 스펙 크기와 렌더링 시간이 일정하다.
+"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from core.config import setting
+
+TREND_SERIES = ['환자수', 'MA6', 'MA30', 'MA60', 'MA90']
+TREND_COLORS = ['#FFDC3C', '#4BA3C7', '#00C49A', '#FF8C42', '#9B59B6']
+
+
+def point_budget() -> int:
+    return int(setting("chart_max_points", 1000))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """(x, y) 점 중 모양을 가장 잘 보존하는 n 개의 위치 (처음과 끝 포함, 정렬됨)."""
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # 처음/끝 점을 뺀 나머지를 n-2 개 구간으로, 마지막 점은 한 칸짜리 구간
+    edges = np.append(np.linspace(1, size - 1, n - 1).astype('int64'), size)
+    out = np.empty(n, dtype='int64')
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi, nxt = edges[i], edges[i + 1], edges[i + 2]
+        # 이전에 고른 점, 다음 구간의 평균 점과 만드는 삼각형이 가장 큰 점
+        avg_x, avg_y = x[hi:nxt].mean(), y[hi:nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(frame: pd.DataFrame, x: str, y: str, budget: int = None) -> pd.DataFrame:
+    """행이 budget 을 넘으면 (x, y) 기준 LTTB 로 고른 행만 (다른 컬럼은 같은 행을 따라감)."""
+    budget = point_budget() if budget is None else budget
+    if len(frame) <= budget:
+        return frame
+    xs = frame[x]
+    if pd.api.types.is_datetime64_any_dtype(xs):
+        xs = xs.to_numpy().astype('datetime64[s]').astype('int64')
+    return frame.iloc[lttb_indices(np.asarray(xs), frame[y].to_numpy(), budget)]
+
+
+def trend_chart(daily: pd.DataFrame):
+    """일별 내원수와 이동평균선. daily: 진료일자 + TREND_SERIES 컬럼 (넓은 형태)."""
+    data = downsample(daily[['진료일자'] + TREND_SERIES], '진료일자', '환자수')
+    # 범례 클릭으로 토글할 셀렉션
+    legend_sel = alt.selection_point(fields=['지표'], bind='legend')
+    base = alt.Chart()
+
+    line = (
+        base.mark_line()
+        .encode(
+            x=alt.X('진료일자:T', title='진료일자'),
+            y=alt.Y('값:Q', title='진료횟수'),
+            color=alt.Color('지표:N', scale=alt.Scale(domain=TREND_SERIES, range=TREND_COLORS)),
+            opacity=alt.condition(legend_sel, alt.value(1), alt.value(0.1)),
+            tooltip=[
+                alt.Tooltip('진료일자:T', title='날짜'),
+                alt.Tooltip('지표:N', title='지표'),
+                alt.Tooltip('값:Q', title='내원수'),
+            ],
+        )
+        .add_params(legend_sel)
+        .interactive()
+        .properties(height=400)
+    )
+    daily_hover = (
+        base.mark_point(size=200, opacity=0)
+        .transform_filter(alt.datum.지표 == '환자수')
+        .encode(
+            x='진료일자:T', y='값:Q',
+            tooltip=[
+                alt.Tooltip('진료일자:T', title='날짜'),
+                alt.Tooltip('값:Q', title='내원수'),
+            ],
+        )
+    )
+    trend_hover = (
+        base.mark_point(size=200, opacity=0)
+        .transform_filter(alt.datum.지표 != '환자수')
+        .encode(
+            x='진료일자:T', y='값:Q',
+            tooltip=[
+                alt.Tooltip('진료일자:T', title='날짜'),
+                alt.Tooltip('지표:N', title='지표'),
+                alt.Tooltip('값:Q', title='내원수'),
+            ],
+        )
+    )
+    return (
+        alt.layer(line, daily_hover, trend_hover, data=data)
+        # 넓은 프레임 → (지표, 값) 긴 형태는 브라우저에서
+        .transform_fold(TREND_SERIES, as_=['지표', '값'])
+        .resolve_scale(y='shared')
+        .properties(width='container', autosize={'type': 'fit-x', 'contains': 'padding'})
+    )
+
+
+def yoy_chart(comp: pd.DataFrame):
+    """조회 기간과 전년 동기 일별 내원수. comp: plot_date, 환자수, year_group, 진료일자."""
+    data = pd.concat(
+        [downsample(g, 'plot_date', '환자수') for _, g in comp.groupby('year_group', sort=False)],
+        ignore_index=True,
+    ) if len(comp) else comp
+    tooltip = [
+        alt.Tooltip('진료일자:T', title='날짜'),
+        alt.Tooltip('환자수:Q', title='내원수'),
+        alt.Tooltip('year_group:N', title='기간'),
+    ]
+    area = (
+        alt.Chart()
+        .mark_area(interpolate='monotone', opacity=0.4)
+        .encode(
+            x=alt.X('plot_date:T', title='진료일자'),
+            y=alt.Y('환자수:Q', title='진료횟수', stack=None),
+            color=alt.Color('year_group:N', title='기간',
+                            scale=alt.Scale(domain=['조회 기간', '전년 동기'],
+                                            range=['#FFDC3C', '#A0AEC0'])),
+            tooltip=tooltip,
+        )
+        .properties(height=400)
+        .interactive()
+    )
+    # 투명 포인트 hover 레이어
+    hover = alt.Chart().mark_point(size=200, opacity=0).encode(
+        x='plot_date:T', y='환자수:Q', tooltip=tooltip
+    )
+    return alt.layer(area, hover, data=data)
+
+
+def growth_chart(monthly: pd.DataFrame):
+    """월간 전년 대비 성장률 막대와 레이블. monthly: 진료일자, 환자수, ly_환자수, growth_rate, count_label."""
+    # 막대 차트
+    bar = (
+        alt.Chart()
+        .mark_bar()
+        .encode(
+            x=alt.X('yearmonth(진료일자):O', title='월'),
+            y=alt.Y('growth_rate:Q', axis=alt.Axis(format='.1%')),
+            tooltip=[
+                alt.Tooltip('yearmonth(진료일자):T', title='월'),
+                alt.Tooltip('growth_rate:Q', title='성장률', format='.1%'),
+                alt.Tooltip('환자수:Q', title='이번 년 환자수'),
+                alt.Tooltip('ly_환자수:Q', title='전년 동기 환자수'),
+            ],
+        )
+        .properties(height=300, width={'step': 60})
+    )
+    # growth_rate 레이블 (막대 위쪽)
+    label_rate = (
+        alt.Chart()
+        .mark_text(dy=-50, align='center', baseline='bottom', fontWeight='bold', fontSize=16)
+        .encode(
+            x='yearmonth(진료일자):O',
+            y='growth_rate:Q',
+            text=alt.Text('growth_rate:Q', format='.1%'),
+        )
+    )
+    # 환자수/전년환자수 레이블 (growth_rate 레이블 바로 아래)
+    label_count = (
+        alt.Chart()
+        .mark_text(dy=-40, align='center', baseline='top', fontWeight='bold',
+                   lineBreak='\\n', fontSize=14)
+        .encode(x='yearmonth(진료일자):O', y='growth_rate:Q', text='count_label:N')
+    )
+    return (
+        alt.layer(bar, label_rate, label_count, data=monthly)
+        .transform_filter(alt.datum.growth_rate != None)  # noqa: E711 (Vega 식)
+    )
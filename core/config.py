@@ -0,0 +1,32 @@
+"""대시보드 설정값 조회.
+
+`st.secrets["dashboard"]` 섹션을 먼저 보고, 없으면 `DASHBOARD_<KEY>` 환경변수,
+그래도 없으면 기본값을 쓴다.
+"""
+import os
+from pathlib import Path
+
+import streamlit as st
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def secret_section(name: str) -> dict:
+    try:
+        return st.secrets.get(name, {})
+    except FileNotFoundError:
+        # secrets.toml 이 없는 로컬/벤치마크 환경
+        return {}
+
+
+def setting(key: str, default=None):
+    section = secret_section("dashboard")
+    if key in section:
+        return section[key]
+    return os.environ.get(f"DASHBOARD_{key.upper()}", default)
+
+
+def cache_dir() -> Path:
+    path = Path(setting("cache_dir", ROOT_DIR / ".cache"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,114 @@
+"""진료 기록 사전 집계 큐브.
+
+(진료일자, 연령대, 성별, 초/재진, 요일, 진료시간대) 조합별 진료 건수와 나이 합계를
+데이터 버전마다 한 번 만들어 두고, 사이드바 필터가 바뀔 때는 원본 진료 기록 대신
+이 큐브를 잘라서 더한다. 큐브 크기는 진료 건수가 아니라 일수에 비례한다.
+"""
+import numpy as np
+import pandas as pd
+
+CUBE_KEYS = ['진료일자', '연령대', '성별', '초/재진', '요일', '진료시간대']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def build_visit_cube(df: pd.DataFrame) -> pd.DataFrame:
+    keys = [df[c] for c in CUBE_KEYS if c != '요일']
+    keys.insert(4, df['진료일자'].dt.dayofweek.astype('int8').rename('요일'))
+    cube = (
+        df['나이']
+        .groupby(keys, observed=True, dropna=False, sort=False)
+        .agg(['size', 'sum', 'count'])
+        .rename(columns={'size': '진료수', 'sum': '나이합', 'count': '나이수'})
+        .reset_index()
+        .sort_values('진료일자', kind='stable', ignore_index=True)
+    )
+    cube['진료수'] = cube['진료수'].astype('int32')
+    cube['나이합'] = cube['나이합'].astype('int64')
+    cube['나이수'] = cube['나이수'].astype('int32')
+    return cube
+
+
+def date_slice(cube, start_date, end_date) -> pd.DataFrame:
+    """start_date~end_date(양끝 포함) 큐브 행. 진료일자가 정렬돼 있어 이진 탐색으로 자른다."""
+    dates = cube['진료일자'].to_numpy()
+    lo = np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side='left')
+    hi = np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right')
+    return cube.iloc[lo:hi]
+
+
+def slice_cube(cube, start_date, end_date, age_bands, gender) -> pd.DataFrame:
+    """사이드바 필터(기간, 연령대, 성별)와 같은 조건의 큐브 행."""
+    part = date_slice(cube, start_date, end_date)
+    mask = part['연령대'].isin(age_bands)
+    if gender != "전체":
+        mask &= part['성별'] == gender
+    return part[mask]
+
+
+def kpis(part: pd.DataFrame) -> dict:
+    counts = int(part['진료수'].sum())
+    new = int(part.loc[part['초/재진'] == "신환", '진료수'].sum())
+    ages = int(part['나이수'].sum())
+    return {
+        'counts': counts,
+        'new': new,
+        # 초/재진이 "신환"이 아닌 나머지 (빈 값 포함)
+        'return': counts - new,
+        'avg_age': part['나이합'].sum() / ages if ages else float('nan'),
+    }
+
+
+def daily_counts(part: pd.DataFrame) -> pd.DataFrame:
+    return (
+        part.groupby('진료일자')['진료수'].sum()
+        .rename('환자수')
+        .reset_index()
+    )
+
+
+def monthly_counts(part: pd.DataFrame) -> pd.DataFrame:
+    return (
+        part.groupby(pd.Grouper(key='진료일자', freq='MS'))['진료수'].sum()
+        .rename('환자수')
+        .reset_index()
+    )
+
+
+def monthly_growth(part: pd.DataFrame, cube: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    """선택 기간 월별 건수와 전년 동기(연령대/성별 필터 없이 기간만) 대비 성장률.
+
+    컬럼: 진료일자(월 초), 환자수, ly_환자수, growth_rate, count_label.
+    """
+    curr = monthly_counts(part)
+    ly = monthly_counts(date_slice(
+        cube,
+        pd.to_datetime(start_date) - pd.DateOffset(years=1),
+        pd.to_datetime(end_date) - pd.DateOffset(years=1)
+    ))
+    return growth_table(curr, ly)
+
+
+def growth_table(curr: pd.DataFrame, ly: pd.DataFrame) -> pd.DataFrame:
+    """월별 건수(진료일자=월 초, 환자수) 두 개로 monthly_growth 와 같은 프레임을."""
+    ly = ly.copy()
+    # 날짜를 비교하기 쉽게 1년 뒤로 옮겨 연동
+    ly['진료일자'] = ly['진료일자'] + pd.DateOffset(years=1)
+    monthly = curr.merge(ly.rename(columns={'환자수': 'ly_환자수'}), on='진료일자', how='left')
+    monthly['growth_rate'] = (monthly['환자수'] - monthly['ly_환자수']) / monthly['ly_환자수']
+    # NaN을 0으로 채우고 int로 변환
+    monthly['ly_환자수'] = monthly['ly_환자수'].fillna(0).astype(int)
+    monthly['count_label'] = (
+        monthly['ly_환자수'].map(lambda x: f"{x:,}명") + "\\n-> " +
+        monthly['환자수'].map(lambda x: f"{x:,}명")
+    )
+    return monthly
+
+
+def weekday_hour_counts(part: pd.DataFrame) -> pd.DataFrame:
+    heat = (
+        part.groupby(['요일', '진료시간대'], observed=True)['진료수'].sum()
+        .rename('count')
+        .reset_index()
+    )
+    heat['요일'] = heat['요일'].map(dict(enumerate(WEEKDAYS)))
+    return heat
@@ -0,0 +1,265 @@
+"""두 페이지가 공유하는 데이터셋.
+
+시트 동기화(두 시트를 동시에)와 파생 구조(지역 인덱스, 환자 차원 테이블, 장악도 테이블과
+필터 질의용 구조)를 한 번에 만든 `Dataset` 을 프로세스 전체(모든 페이지, 모든 세션)에서 공유한다.
+필터 질의용 구조는 기본(pandas)이면 진료 기록 프레임 + 집계 큐브, 일별 시계열, 고유 환자
+인덱스이고, `query_backend=duckdb` 이면 Parquet 위 SQL 엔진 하나다 (진료 기록 프레임과
+pandas 구조는 만들거나 들고 있지 않음).
+백그라운드 스레드가 `refresh_minutes` 마다 새 버전을 만들어 교체한다.
+페이지는 rerun 시작 때 `current_dataset()` 을 한 번 호출해 그 버전만 쓰고,
+프레임은 공유 객체이므로 제자리 수정하지 말고 필터/복사본을 만들어 쓴다.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from core.boundaries import backfill_regions, get_boundaries
+from core.config import secret_section, setting
+from core.cube import build_visit_cube
+from core.distinct import DistinctPatientIndex
+from core.engine import SqlEngine, build_engine
+from core.instrument import Run, recording, stage
+from core.penetration import ActivityTable, population_long
+from core.patients import PatientTable
+from core.preprocess import preprocess_population, preprocess_visits
+from core.refresh import DataStore
+from core.regions import RegionIndex
+from core.schema import apply_schema
+from core.timeseries import TimeSeriesEngine
+from core.sources import get_source
+
+logger = logging.getLogger(__name__)
+
+POPULATION_SHEET = "연령별인구현황"
+
+
+def visit_sheet_name() -> str:
+    return secret_section("google_sheets").get("worksheet_name", "Sheet1")
+
+
+@dataclass
+class Dataset:
+    version: int
+    fingerprint: tuple
+    synced_at: datetime
+    build_seconds: float
+    # 진료 기록 요약 (사이드바 기본값·표시용, 두 백엔드 공통)
+    visit_rows: int
+    first_day: pd.Timestamp
+    last_day: pd.Timestamp
+    age_bands: list
+    genders: list
+    # (타입 변환 전, 후) 바이트 수
+    memory: tuple
+    # 좌표로 행정동을 채운 진료 건수
+    backfilled: int
+    regions: RegionIndex
+    population: pd.DataFrame
+    population_long: pd.DataFrame
+    patients: PatientTable
+    # pandas 경로 (query_backend=duckdb 이면 None)
+    visits: pd.DataFrame = None
+    cube: pd.DataFrame = None
+    timeseries: TimeSeriesEngine = None
+    patient_index: DistinctPatientIndex = None
+    # query_backend=duckdb 일 때 필터/집계 질의를 처리하는 SQL 엔진 (아니면 None)
+    engine: SqlEngine = None
+    # 이 버전을 만든 갱신의 단계별 계측
+    build_run: Run = None
+    _activity: dict = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def activity(self, today) -> ActivityTable:
+        """오늘 날짜 기준 지역 × 연령대 × 활성 개월 환자수 테이블 (날짜별로 한 번 만듦)."""
+        with self._lock:
+            if today not in self._activity:
+                self._activity = {today: ActivityTable(self.patients.frame, today, len(self.regions.keys))}
+            return self._activity[today]
+
+
+def _timed_read(source, name, date_col, known):
+    started = time.perf_counter()
+    # 첫 로드(직전 지문 없음)는 요청 경로라 스냅샷 전체 재로드를 미룬다
+    frame, key = source.read(name, date_col=date_col, known=known, periodic_reload=known is not None)
+    return frame, key, time.perf_counter() - started
+
+
+def _sync_sheets(progress=None, known=None):
+    """진료 기록과 인구현황 시트를 동시에 받는다 (인증 세션 하나를 같이 씀).
+
+    걸리는 시간은 두 시트의 합이 아니라 느린 쪽 하나에 가깝다. `load_timeout_seconds`
+    안에 둘 다 끝나지 않으면 TimeoutError. progress(이름, 초) 는 호출한 스레드에서
+    시작 때(초=None)와 시트마다 끝날 때 불린다.
+
+    known: 직전 데이터셋의 지문. 같으면 (None, None, 지문) 으로 프레임을 만들지 않고,
+    한쪽 시트만 바뀌었으면 바뀌지 않은 쪽도 다시 읽는다.
+    """
+    source = get_source()
+    source.connect()
+    sheets = {"진료 기록": (visit_sheet_name(), '진료일자'), "인구현황": (POPULATION_SHEET, None)}
+    known = dict(zip(sheets, known or (None, None)))
+    timeout = float(setting("load_timeout_seconds", 300))
+    deadline = time.monotonic() + timeout
+    pool = ThreadPoolExecutor(max_workers=len(sheets), thread_name_prefix="sheet-load")
+    try:
+        futures = {
+            pool.submit(_timed_read, source, *args, known[label]): label for label, args in sheets.items()
+        }
+        if progress is not None:
+            for label in sheets:
+                progress(label, None)
+        results = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                waiting = ", ".join(futures[f] for f in pending)
+                raise TimeoutError(f"{waiting} 시트를 {timeout:g}초 안에 받지 못했습니다")
+            for future in done:
+                label = futures[future]
+                frame, key, seconds = future.result()
+                results[label] = (frame, key)
+                if frame is None:
+                    logger.info("%s 시트 변경 없음 %.1f초", label, seconds)
+                else:
+                    logger.info("%s 시트 %d행 %.1f초", label, len(frame), seconds)
+                if progress is not None:
+                    progress(label, seconds)
+    finally:
+        # 시간 초과면 남은 읽기를 기다리지 않는다 (스레드는 끝나면 알아서 정리됨)
+        pool.shutdown(wait=False, cancel_futures=True)
+    fingerprint = tuple(results[label][1] for label in sheets)
+    if fingerprint == tuple(known.values()):
+        return None, None, fingerprint
+    for label, (name, date_col) in sheets.items():
+        if results[label][0] is None:
+            results[label] = source.read(name, date_col=date_col)
+    return results["진료 기록"][0], results["인구현황"][0], fingerprint
+
+
+def build_dataset(previous: Dataset = None, progress=None):
+    """시트를 동기화하고 파생 구조를 전부 만든다. 시트가 그대로면 None."""
+    with recording("데이터 갱신") as run:
+        started = time.perf_counter()
+        with stage("시트 동기화") as s:
+            # 지문을 먼저 보고, 직전 버전과 같으면 프레임을 만들지 않고 끝낸다
+            raw_visits, raw_pop, fingerprint = _sync_sheets(
+                progress, previous.fingerprint if previous is not None else None
+            )
+            if raw_visits is None:
+                return None
+            s.rows_out = len(raw_visits)
+
+        with stage("인구현황 전처리", rows_in=len(raw_pop)) as s:
+            pop = preprocess_population(raw_pop)
+            s.rows_out = len(pop)
+        with stage("진료 기록 전처리", rows_in=len(raw_visits)) as s:
+            visits = preprocess_visits(raw_visits)
+            s.rows_out = len(visits)
+        with stage("행정동 보완 (좌표)") as s:
+            # 행정동이 빈 진료를 좌표가 든 경계로 채움 (경계 파일이 있을 때만)
+            visits, backfilled = backfill_regions(visits, pop, get_boundaries())
+            s.rows_out = backfilled
+        with stage("진료 기록 타입 변환", rows_in=len(visits)):
+            visits, memory = apply_schema(visits)
+        with stage("지역 인덱스") as s:
+            regions = RegionIndex(pop, extra=visits)
+            pop = pop.assign(지역코드=regions.encode(pop))
+            s.rows_out = len(regions.keys)
+        with stage("환자 차원 테이블", rows_in=len(visits)) as s:
+            patients = PatientTable(visits, regions)
+            s.rows_out = len(patients)
+        with stage("인구 긴 테이블", rows_in=len(pop)) as s:
+            pop_long = population_long(pop)
+            s.rows_out = len(pop_long)
+        version = (previous.version + 1) if previous else 1
+        with stage("SQL 엔진 (Parquet)", rows_in=len(visits)):
+            engine = build_engine(version, visits, patients.frame, pop_long)
+
+        dataset = Dataset(
+            version=version,
+            fingerprint=fingerprint,
+            synced_at=datetime.now(),
+            build_seconds=0.0,
+            visit_rows=len(visits),
+            first_day=visits['진료일자'].min(),
+            last_day=visits['진료일자'].max(),
+            age_bands=visits['연령대'].cat.categories.tolist(),
+            genders=visits['성별'].dropna().unique().tolist(),
+            memory=memory,
+            backfilled=backfilled,
+            regions=regions,
+            population=pop,
+            population_long=pop_long,
+            patients=patients,
+            engine=engine,
+            build_run=run,
+        )
+        if engine is None:
+            # SQL 엔진이 없을 때만: 진료 기록 프레임을 들고 그 위 pandas 구조를 만든다
+            with stage("집계 큐브", rows_in=len(visits)) as s:
+                dataset.cube = build_visit_cube(visits)
+                s.rows_out = len(dataset.cube)
+            with stage("시계열 엔진", rows_in=len(dataset.cube)):
+                dataset.timeseries = TimeSeriesEngine(dataset.cube)
+            with stage("고유 환자 인덱스", rows_in=len(visits)):
+                dataset.patient_index = DistinctPatientIndex(visits)
+            dataset.visits = visits
+        dataset.build_seconds = time.perf_counter() - started
+        return dataset
+
+
+@st.cache_resource
+def get_store() -> DataStore:
+    store = DataStore(build_dataset)
+    store.start(float(setting("refresh_minutes", 10)) * 60)
+    return store
+
+
+def current_dataset() -> Dataset:
+    """지금 게시된 데이터셋. 한 rerun 안에서는 한 번만 불러 같은 버전을 쓴다.
+
+    첫 로드(콜드 스타트)는 시트별 진행 상황을 보여 준다.
+    """
+    store = get_store()
+    if store.ready:
+        return store.current()
+    with st.status("데이터를 불러오는 중...", expanded=True) as status:
+        lines, done = {}, set()
+
+        def progress(label, seconds):
+            if seconds is None:
+                lines[label] = st.empty()
+                lines[label].write(f"⏳ {label} 받는 중")
+                return
+            lines[label].write(f"✅ {label} {seconds:.1f}초")
+            done.add(label)
+            if done == set(lines):
+                status.update(label="파생 구조를 만드는 중...")
+
+        try:
+            dataset = store.current(progress)
+        except Exception:
+            status.update(label="데이터를 불러오지 못했습니다", state="error")
+            raise
+        status.update(label=f"데이터 v{dataset.version} 준비 완료", state="complete", expanded=False)
+    return dataset
+
+
+def data_status(dataset: Dataset):
+    """사이드바용 데이터 버전 표시."""
+    store = get_store()
+    st.sidebar.caption(
+        f"데이터 v{dataset.version} · {dataset.synced_at:%Y-%m-%d %H:%M} 기준 · "
+        f"갱신 {dataset.build_seconds:.1f}초 · 마지막 확인 {store.checked_at:%H:%M}"
+    )
+    error = store.last_error
+    if error is not None:
+        st.sidebar.warning(f"최근 자동 갱신 실패: {error}")
@@ -0,0 +1,262 @@
+"""선택적 SQL 질의 백엔드 (DuckDB over Parquet).
+
+`query_backend` 설정이 "duckdb" 이면 데이터 버전마다 전처리된 진료 기록, 환자 차원
+테이블, 인구 긴 테이블을 `cache_dir()/duckdb/<프로세스>/v<버전>/` 아래 Parquet 로 한 번 쓰고,
+KPI·일별/월별 건수·요일×시간대·지도 좌표·장악도 조회를 그 파일에 대한 SQL 로 처리한다.
+데이터셋은 이때 진료 기록 프레임과 큐브/시계열/고유 환자 인덱스를 들고 있지 않는다
+(core.data). 필터 조건은 WHERE 절로 내려가고(진료 기록은 진료일자 순으로 써서 행 그룹
+통계로 기간 밖 행 그룹은 읽지 않음) 돌아오는 것은 작은 집계 결과뿐이다.
+
+DuckDB 는 `duckdb_memory_limit`(기본 1GB) 을 넘으면 프로세스 디렉터리의 tmp 로
+내려 쓰면서(out-of-core) 처리하므로, 질의 메모리가 기록 기간에 비례해 커지지 않는다.
+프로세스(워커)마다 디렉터리를 따로 써서 버전 번호가 같아도 서로의 파일을 덮어쓰지 않고,
+끝난 프로세스의 디렉터리는 다음 프로세스가 지운다.
+결과 프레임 모양은 core.cube / core.timeseries / core.geo / core.penetration 의 pandas
+경로와 같다. duckdb 가 없으면 경고만 남기고 pandas 경로를 쓴다.
+"""
+import importlib.util
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.config import cache_dir, setting
+from core.cube import WEEKDAYS, growth_table
+from core.penetration import MAX_MONTHS
+from core.timeseries import MAX_SLICES, DailySeries
+
+logger = logging.getLogger(__name__)
+
+# 진료일자 순 Parquet 의 행 그룹 크기 (기간 조건으로 건너뛰는 단위)
+ROW_GROUP_ROWS = 256_000
+# 지난 버전 디렉터리는 이만큼만 남긴다 (직전 버전을 쓰는 rerun 이 끝날 때까지)
+KEEP_VERSIONS = 2
+# 이 프로세스의 디렉터리 이름 (pid 는 재시작 후 다시 쓰일 수 있어 임의 토큰을 붙임)
+PROCESS_DIR = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def backend() -> str:
+    return setting("query_backend", "pandas")
+
+
+def _visit_table(visits: pd.DataFrame):
+    import pyarrow as pa
+
+    ids = visits['환자번호']
+    if not isinstance(ids.dtype, pd.CategoricalDtype):
+        ids = ids.astype('category')
+    codes = ids.cat.codes.to_numpy()
+    return pa.table({
+        'day': pa.array(visits['진료일자'].to_numpy().astype('datetime64[D]')),
+        # 환자번호는 범주 코드(정수)로: 고유 환자수가 정수 집합 연산이 된다
+        'patient': pa.array(codes.astype('int32'), mask=codes < 0),
+        'age': pa.array(visits['나이'], type=pa.int16(), from_pandas=True),
+        'age_band': pa.array(visits['연령대'].astype(object), type=pa.string(), from_pandas=True),
+        'gender': pa.array(visits['성별'].astype(object), type=pa.string(), from_pandas=True),
+        'visit_type': pa.array(visits['초/재진'].astype(object), type=pa.string(), from_pandas=True),
+        'weekday': pa.array(visits['진료일자'].dt.dayofweek.to_numpy().astype('int8')),
+        'hour': pa.array(visits['진료시간대'].astype(object), type=pa.string(), from_pandas=True),
+        'y': pa.array(visits['y'], type=pa.float32(), from_pandas=True),
+        'x': pa.array(visits['x'], type=pa.float32(), from_pandas=True),
+    })
+
+
+class SqlEngine:
+    def __init__(self, version: int, visits: pd.DataFrame, patients: pd.DataFrame, pop_long: pd.DataFrame):
+        import duckdb
+        import pyarrow.parquet as pq
+
+        root = cache_dir() / "duckdb" / PROCESS_DIR
+        self.directory = root / f"v{version}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pq.write_table(_visit_table(visits), self.directory / "visits.parquet", row_group_size=ROW_GROUP_ROWS)
+        pd.DataFrame({
+            'last_day': patients['마지막진료일'].to_numpy().astype('datetime64[D]'),
+            'region': patients['지역코드'].to_numpy(),
+            'age_band': patients['연령대'].astype(object),
+        }).to_parquet(self.directory / "patients.parquet", index=False)
+        # 결과를 pop_long 과 같은 행 순서로 돌려주기 위한 행 번호
+        pop_long.assign(_row=np.arange(len(pop_long))).to_parquet(self.directory / "population.parquet", index=False)
+        _prune(root, version)
+
+        self.calendar = pd.date_range(visits['진료일자'].iloc[0], visits['진료일자'].iloc[-1], freq='D') \
+            if len(visits) else pd.DatetimeIndex([])
+        self._con = duckdb.connect()
+        self._con.execute(f"SET memory_limit = '{setting('duckdb_memory_limit', '1GB')}'")
+        tmp = root / "tmp"
+        tmp.mkdir(exist_ok=True)
+        self._con.execute(f"SET temp_directory = '{tmp}'")
+        threads = setting("duckdb_threads")
+        if threads:
+            self._con.execute(f"SET threads = {int(threads)}")
+        for name in ("visits", "patients", "population"):
+            path = self.directory / f"{name}.parquet"
+            # 진료 기록은 파일 행 번호(= 진료일자 순 위치)로 환자별 마지막 진료를 고른다
+            options = ", file_row_number = true" if name == "visits" else ""
+            self._con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{path}'{options})")
+        self._slices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, params: list) -> pd.DataFrame:
+        # 연결 하나를 세션 스레드들이 같이 쓰므로 질의마다 커서(복제 연결)
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _where(start_date, end_date, age_bands, gender):
+        """사이드바 필터 → (WHERE 절, 매개변수). start/end 가 None 이면 기간 조건 없음."""
+        clauses, params = ["list_contains(?, age_band)"], [list(age_bands)]
+        if start_date is not None:
+            clauses.append("day BETWEEN ? AND ?")
+            params += [pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()]
+        if gender != "전체":
+            clauses.append("gender = ?")
+            params.append(gender)
+        return " AND ".join(clauses), params
+
+    def kpis(self, start_date, end_date, age_bands, gender) -> dict:
+        """cube.kpis 에 고유 환자수('patients')를 더한 dict."""
+        where, params = self._where(start_date, end_date, age_bands, gender)
+        row = self._query(f"""
+            SELECT count(*) AS counts,
+                   count(*) FILTER (WHERE visit_type = '신환') AS new,
+                   avg(age) AS avg_age,
+                   -- 환자번호가 빈 진료는 한 명으로 (DistinctPatientIndex 와 같게)
+                   count(DISTINCT patient) + (count(*) FILTER (WHERE patient IS NULL) > 0)::INT AS patients
+            FROM visits WHERE {where}
+        """, params).iloc[0]
+        counts = int(row['counts'])
+        return {
+            'counts': counts,
+            'new': int(row['new']),
+            'return': counts - int(row['new']),
+            'avg_age': float(row['avg_age']) if pd.notna(row['avg_age']) else float('nan'),
+            'patients': int(row['patients']),
+        }
+
+    def series(self, age_bands=None, gender="전체") -> DailySeries:
+        """TimeSeriesEngine.series 와 같은 일별 시계열 (달력 전체, 조합별 최근 MAX_SLICES 개 보관)."""
+        key = (None if age_bands is None else tuple(sorted(age_bands)), gender)
+        with self._lock:
+            if key in self._slices:
+                self._slices.move_to_end(key)
+                return self._slices[key]
+        if age_bands is None:
+            where, params = ("TRUE", []) if gender == "전체" else ("gender = ?", [gender])
+        else:
+            where, params = self._where(None, None, age_bands, gender)
+        daily = self._query(f"SELECT day, count(*) AS n FROM visits WHERE {where} GROUP BY day", params)
+        counts = np.zeros(len(self.calendar), dtype='int64')
+        if len(daily):
+            pos = self.calendar.get_indexer(pd.to_datetime(daily['day']))
+            counts[pos] = daily['n'].to_numpy()
+        series = DailySeries(self.calendar, counts)
+        with self._lock:
+            self._slices[key] = series
+            while len(self._slices) > MAX_SLICES:
+                self._slices.popitem(last=False)
+        return series
+
+    def _monthly(self, where: str, params: list) -> pd.DataFrame:
+        monthly = self._query(f"""
+            SELECT date_trunc('month', day) AS month, count(*) AS n
+            FROM visits WHERE {where} GROUP BY month ORDER BY month
+        """, params)
+        if monthly.empty:
+            return pd.DataFrame({'진료일자': pd.DatetimeIndex([]), '환자수': np.empty(0, dtype='int64')})
+        # monthly_counts(pd.Grouper) 와 같이 사이의 빈 달은 0
+        months = pd.to_datetime(monthly['month'])
+        index = pd.date_range(months.iloc[0], months.iloc[-1], freq='MS')
+        counts = pd.Series(monthly['n'].to_numpy(), index=months).reindex(index, fill_value=0)
+        return pd.DataFrame({'진료일자': index, '환자수': counts.to_numpy().astype('int64')})
+
+    def monthly_growth(self, start_date, end_date, age_bands, gender) -> pd.DataFrame:
+        """cube.monthly_growth 와 같은 프레임 (전년 동기는 연령대/성별 조건 없이 기간만)."""
+        curr = self._monthly(*self._where(start_date, end_date, age_bands, gender))
+        start = pd.Timestamp(start_date) - pd.DateOffset(years=1)
+        end = pd.Timestamp(end_date) - pd.DateOffset(years=1)
+        ly = self._monthly("day BETWEEN ? AND ?", [start.date(), end.date()])
+        return growth_table(curr, ly)
+
+    def weekday_hour_counts(self, start_date, end_date, age_bands, gender) -> pd.DataFrame:
+        """cube.weekday_hour_counts 와 같은 (요일, 진료시간대, count)."""
+        where, params = self._where(start_date, end_date, age_bands, gender)
+        heat = self._query(f"""
+            SELECT weekday AS 요일, hour AS 진료시간대, count(*) AS count
+            FROM visits WHERE {where} GROUP BY ALL ORDER BY 요일, 진료시간대
+        """, params)
+        heat['요일'] = heat['요일'].map(dict(enumerate(WEEKDAYS)))
+        return heat
+
+    def points(self, start_date, end_date, age_bands, gender) -> pd.DataFrame:
+        """geo.patient_points 와 같은 환자별 마지막 좌표 (y=위도, x=경도, 마지막 진료 순)."""
+        where, params = self._where(start_date, end_date, age_bands, gender)
+        return self._query(f"""
+            SELECT y, x FROM visits
+            WHERE {where} AND y IS NOT NULL AND x IS NOT NULL AND NOT isnan(y) AND NOT isnan(x)
+            -- 환자번호가 빈 진료는 한 명으로 (patient_points 와 같게)
+            QUALIFY row_number() OVER (PARTITION BY patient ORDER BY file_row_number DESC) = 1
+            ORDER BY file_row_number
+        """, params)
+
+    def penetration(self, today, months: int) -> pd.DataFrame:
+        """ActivityTable.penetration 과 같은 프레임 (인구 긴 테이블 + 활성 환자수, 장악도(%))."""
+        # ActivityTable 의 '경과일+1 을 30일 단위로 올림 <= months' 와 같은 조건
+        active = "TRUE" if months >= MAX_MONTHS else "datediff('day', last_day, ?::DATE) < 30 * ?"
+        params = [] if months >= MAX_MONTHS else [pd.Timestamp(today).date(), months]
+        out = self._query(f"""
+            WITH active AS (
+                SELECT region, age_band, count(*) AS n FROM patients WHERE {active} GROUP BY ALL
+            )
+            SELECT p.*, coalesce(a.n, 0) AS 환자수
+            FROM population p LEFT JOIN active a ON a.region = p."지역코드" AND a.age_band = p."연령대"
+            ORDER BY p._row
+        """, params).drop(columns='_row')
+        out['장악도(%)'] = (out['환자수'] / out['인구수'] * 100).round(2)
+        return out
+
+    def close(self):
+        self._con.close()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _prune(root, version: int):
+    for path in root.glob("v*"):
+        try:
+            old = int(path.name[1:])
+        except ValueError:
+            continue
+        if old <= version - KEEP_VERSIONS:
+            shutil.rmtree(path, ignore_errors=True)
+    # 끝난 프로세스가 남긴 디렉터리
+    for path in root.parent.iterdir():
+        pid = path.name.split("-")[0]
+        if path != root and path.is_dir() and pid.isdigit() and not _alive(int(pid)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_engine(version: int, visits: pd.DataFrame, patients: pd.DataFrame, pop_long: pd.DataFrame):
+    """설정이 duckdb 일 때만 SqlEngine, 아니면 None (duckdb 가 없을 때도 None)."""
+    if backend() != "duckdb":
+        return None
+    if importlib.util.find_spec("duckdb") is None:
+        logger.warning("query_backend=duckdb 이지만 duckdb 가 없어 pandas 경로를 씁니다")
+        return None
+    return SqlEngine(version, visits, patients, pop_long)
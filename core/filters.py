@@ -0,0 +1,36 @@
+"""사이드바 필터 조건을 진료 기록 행 번호로.
+
+진료 기록은 진료일자 순으로 정렬돼 있으므로 기간은 이진 탐색으로 구한 행 구간이고,
+연령대/성별은 그 구간 안에서만 범주 코드(정수)로 비교한다. 결과는 행 번호 배열이라
+필터된 프레임 복사본을 만들지 않고 필요한 컬럼만 그 행에서 꺼내 쓴다.
+"""
+import numpy as np
+import pandas as pd
+
+
+def date_rows(df: pd.DataFrame, start_date, end_date):
+    """start_date~end_date(양끝 포함) 행 구간 [lo, hi)."""
+    dates = df['진료일자'].to_numpy()
+    lo = np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side='left')
+    hi = np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right')
+    return int(lo), int(max(hi, lo))
+
+
+def category_mask(col: pd.Series, values) -> np.ndarray:
+    """범주형 컬럼이 values 중 하나인지 (빈 값은 False). 코드 조회표로 한 번에."""
+    categories = col.cat.categories
+    wanted = categories.get_indexer(list(values))
+    # 코드 -1(빈 값)은 0번 칸
+    table = np.zeros(len(categories) + 1, dtype=bool)
+    table[wanted[wanted >= 0] + 1] = True
+    return table[col.cat.codes.to_numpy().astype('int64') + 1]
+
+
+def visit_rows(df: pd.DataFrame, start_date, end_date, age_bands, gender) -> np.ndarray:
+    """조건에 맞는 진료 기록의 행 번호 (오름차순)."""
+    lo, hi = date_rows(df, start_date, end_date)
+    part = df.iloc[lo:hi]
+    mask = category_mask(part['연령대'], age_bands)
+    if gender != "전체":
+        mask &= category_mask(part['성별'], [gender])
+    return np.flatnonzero(mask) + lo
@@ -0,0 +1,51 @@
+"""지도용 좌표 집계.
+
+환자 좌표를 브라우저로 전부 보내는 대신 서버에서 격자 칸별로 세어 칸 수만큼만
+보낸다. 칸 크기는 웹 지도 줌 레벨 기준(타일 한 장을 CELLS_PER_TILE 칸으로)이다.
+"""
+import numpy as np
+import pandas as pd
+
+CELLS_PER_TILE = 8
+
+
+def patient_points(df: pd.DataFrame, rows: np.ndarray) -> pd.DataFrame:
+    """rows(행 번호) 진료 중 환자별 마지막 좌표 하나씩 (y=위도, x=경도)."""
+    y = df['y'].to_numpy()
+    x = df['x'].to_numpy()
+    rows = rows[~(np.isnan(y[rows]) | np.isnan(x[rows]))]
+    ids = df['환자번호']
+    if isinstance(ids.dtype, pd.CategoricalDtype):
+        patients = ids.cat.codes.to_numpy()[rows].astype('int64') + 1
+        n_patients = len(ids.cat.categories) + 1
+    else:
+        patients = pd.factorize(ids.to_numpy()[rows])[0] + 1
+        n_patients = int(patients.max(initial=0)) + 1
+    # 환자 코드별 가장 뒤 행 위치 (코드 -1 빈 값은 0번 칸), 원래 순서대로
+    last = np.full(n_patients, -1, dtype='int64')
+    np.maximum.at(last, patients, np.arange(len(rows)))
+    last = rows[np.sort(last[last >= 0])]
+    return pd.DataFrame({'y': y[last], 'x': x[last]})
+
+
+def cell_size(zoom: int) -> float:
+    return 360 / 2 ** zoom / CELLS_PER_TILE
+
+
+def grid_cells(points: pd.DataFrame, zoom: int) -> pd.DataFrame:
+    """격자 칸별 환자수. 좌표는 칸 안 점들의 평균 위치."""
+    size = cell_size(zoom)
+    lat = points['y'].to_numpy(dtype='float64')
+    lon = points['x'].to_numpy(dtype='float64')
+    cells = (
+        pd.DataFrame({
+            'row': np.floor(lat / size).astype('int64'),
+            'col': np.floor(lon / size).astype('int64'),
+            'lat': lat,
+            'lon': lon,
+        })
+        .groupby(['row', 'col'], sort=False)
+        .agg(lat=('lat', 'mean'), lon=('lon', 'mean'), count=('lat', 'size'))
+        .reset_index(drop=True)
+    )
+    return cells
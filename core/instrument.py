@@ -0,0 +1,242 @@
+"""단계별 시간/행 수/메모리 계측.
+
+페이지는 맨 위에서 `begin_run(페이지 이름)` 을 부르고 번호 붙은 구간을
+`with stage("이름") as s:` 로 감싼다 (함수에는 `@stage("이름")` 데코레이터).
+구간 안에서 `s.rows_in`, `s.rows_out` 에 행 수를 적어 두면 함께 기록된다.
+기록은 스레드별 현재 실행(Run)에 쌓이므로 세션마다 따로 모이고, 백그라운드 데이터
+갱신도 `recording("데이터 갱신")` 으로 같은 방식으로 잰다.
+
+메모리는 기본적으로 프로세스 RSS 변화량(다른 세션과 공유되는 근사치)이고,
+관리자 패널에서 tracemalloc 을 켜면 구간별 새로 할당한 최대 바이트로 바뀐다
+(tracemalloc 은 파이썬 객체 할당마다 부하가 커서 기본으로는 끈다).
+
+`perf_panel()` 은 페이지 끝에서 실행을 마감하고, 주소에 `?admin` 이 있고 관리자
+비밀번호가 맞을 때만 사이드바에 표를 보여 준다. `perf_log` 설정이 있으면 모든
+실행 기록을 그 파일에 JSON lines 로 덧붙인다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import ContextDecorator, contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from core.config import secret_section, setting
+
+logger = logging.getLogger(__name__)
+
+HISTORY_RUNS = 20
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def _rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # /proc 가 없는 환경
+        return None
+
+
+class Run:
+    """한 번의 rerun(또는 데이터 갱신)에서 모은 구간 기록."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = datetime.now()
+        self.records = []
+        # 구간 밖 이벤트 수 (결과 캐시 적중/실패 등)
+        self.counters = Counter()
+
+    def add(self, record: dict):
+        self.records.append({"run": self.name, "started": self.started.isoformat(timespec="seconds"), **record})
+
+    @property
+    def seconds(self) -> float:
+        return sum(r["seconds"] for r in self.records)
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def count(name: str, n: int = 1):
+    """현재 실행의 이벤트 수를 센다 (실행이 없으면 무시)."""
+    run = current_run()
+    if run is not None:
+        run.counters[name] += n
+
+
+class stage(ContextDecorator):
+    """구간 하나의 시간/행 수/메모리. 현재 실행이 없으면 재기만 하고 버린다."""
+
+    def __init__(self, name: str, rows_in: int = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def _recreate_cm(self):
+        # 데코레이터로 쓸 때 호출마다 새 객체 (동시 호출끼리 상태를 섞지 않게)
+        return stage(self.name, self.rows_in)
+
+    def __enter__(self):
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        else:
+            self._mem0 = _rss()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._t0
+        if self._tracing and tracemalloc.is_tracing():
+            memory = tracemalloc.get_traced_memory()[1] - self._mem0
+        else:
+            rss = _rss()
+            memory = rss - self._mem0 if rss is not None and self._mem0 is not None else None
+        run = current_run()
+        if run is not None:
+            run.add({
+                "stage": self.name,
+                "seconds": round(seconds, 6),
+                "rows_in": self.rows_in,
+                "rows_out": self.rows_out,
+                "memory_bytes": memory,
+                "error": exc_type.__name__ if exc_type else None,
+            })
+        return False
+
+
+@contextmanager
+def recording(name: str):
+    """with 블록 동안 이 스레드의 구간 기록을 새 Run 에 모은다."""
+    previous = current_run()
+    run = _local.run = Run(name)
+    try:
+        yield run
+    finally:
+        _local.run = previous
+        _append_log(run)
+
+
+def _history() -> deque:
+    return st.session_state.setdefault("perf_history", deque(maxlen=HISTORY_RUNS))
+
+
+@contextmanager
+def section_run(name: str):
+    """st.fragment 구간용. 페이지 전체 실행 중이면 그 실행에 기록하고, fragment 만 단독으로
+    다시 실행될 때는 별도 실행으로 기록해 세션 기록과 로그에 남긴다 (사이드바 패널은 다음 전체 실행 때 갱신)."""
+    run = current_run()
+    if run is not None:
+        yield run
+        return
+    with recording(name) as run:
+        yield run
+    _history().append(run)
+
+
+def begin_run(name: str) -> Run:
+    """페이지 rerun 시작. 끝은 perf_panel() 에서."""
+    run = _local.run = Run(name)
+    return run
+
+
+def _lines(run: Run):
+    for record in run.records:
+        yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    if run.counters:
+        summary = {"run": run.name, "started": run.started.isoformat(timespec="seconds"),
+                   "counters": dict(run.counters)}
+        yield json.dumps(summary, ensure_ascii=False) + "\n"
+
+
+def _append_log(run: Run):
+    path = setting("perf_log")
+    if not path or not run.records:
+        return
+    try:
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.writelines(_lines(run))
+    except OSError as e:
+        logger.warning("계측 로그 기록 실패: %s", e)
+
+
+def to_jsonl(runs) -> str:
+    return "".join(line for run in runs for line in _lines(run))
+
+
+def _is_admin() -> bool:
+    if "admin" not in st.query_params:
+        return False
+    if st.session_state.get("perf_admin"):
+        return True
+    password = secret_section("general").get("ADMIN_PASSWORD")
+    if not password:
+        return False
+    pw = st.sidebar.text_input("관리자 비밀번호", type="password", key="perf_admin_pw")
+    if pw and pw == password:
+        st.session_state.perf_admin = True
+        return True
+    return False
+
+
+def _table(run: Run) -> pd.DataFrame:
+    df = pd.DataFrame(run.records, columns=["stage", "seconds", "rows_in", "rows_out", "memory_bytes"])
+    df[["rows_in", "rows_out"]] = df[["rows_in", "rows_out"]].astype("Int64")
+    df["ms"] = (df.pop("seconds") * 1000).round(1)
+    df["MB"] = (df.pop("memory_bytes").astype(float) / 2**20).round(1)
+    return df.rename(columns={"stage": "구간"})
+
+
+def perf_panel(build_run: Run = None, stats: dict = None):
+    """현재 rerun 기록을 마감하고, 관리자에게는 사이드바 계측 패널을 보여 준다.
+
+    stats: {이름: 값 dict} 형태의 공유 자원 상태 (예: 결과 캐시 적중률), 패널에 함께 표시.
+    """
+    run = current_run()
+    _local.run = None
+    if run is None:
+        return
+    _append_log(run)
+    history = _history()
+    history.append(run)
+
+    if not _is_admin():
+        return
+    with st.sidebar.expander("성능 계측", expanded=True):
+        st.caption(f"{run.name} · {run.started:%H:%M:%S} · 합계 {run.seconds * 1000:,.0f}ms")
+        st.dataframe(_table(run), hide_index=True)
+        if run.counters:
+            st.caption("이번 실행: " + " · ".join(f"{k} {v:,}" for k, v in sorted(run.counters.items())))
+        for name, values in (stats or {}).items():
+            st.caption(f"{name}: " + " · ".join(
+                f"{k} {v:.1%}" if k.endswith("ratio") else
+                f"{k} {v / 2**20:,.1f}MB" if k == "bytes" else f"{k} {v:,}"
+                for k, v in values.items()
+            ))
+        if build_run is not None and build_run.records:
+            st.caption(f"데이터 갱신 · {build_run.started:%H:%M:%S} · 합계 {build_run.seconds:,.1f}s")
+            st.dataframe(_table(build_run), hide_index=True)
+        trace = st.toggle("tracemalloc (느려짐)", value=tracemalloc.is_tracing())
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        runs = list(history) + ([build_run] if build_run is not None else [])
+        st.download_button(
+            "최근 기록 내려받기 (JSON lines)",
+            to_jsonl(runs),
+            file_name="perf.jsonl",
+            mime="application/x-ndjson",
+        )
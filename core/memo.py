@@ -0,0 +1,87 @@
+"""필터 상태별 계산 결과 캐시 (모든 세션 공유, LRU).
+
+키는 (구간 이름, 데이터 버전, 시작일, 종료일, 연령대 튜플, 성별, ...) 이고 값은 KPI
+dict, 차트용 집계 프레임, 지도 좌표 같은 결과물이다. 항목 수(`memo_max_entries`)와
+추정 메모리(`memo_max_mb`) 중 하나라도 넘으면 가장 오래 안 쓴 항목부터 버린다.
+데이터 버전이 키에 들어 있으므로 새 버전의 결과는 새 항목이 되고, 옛 버전 항목은
+안 쓰이다가 LRU 로 밀려난다. 값은 여러 세션이 같이 보므로 꺼낸 뒤 수정하지 않는다.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.config import setting
+from core.instrument import count
+
+
+def estimate_bytes(value) -> int:
+    """결과물의 대략적인 메모리 크기."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        """key 의 결과. 없으면 compute() 로 만들어 넣는다 (계산은 락 밖에서)."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                count("memo_hit")
+                return self._items[key][0]
+            self.misses += 1
+        count("memo_miss")
+        value = compute()
+        size = estimate_bytes(value)
+        with self._lock:
+            if key not in self._items and size <= self.max_bytes:
+                self._items[key] = (value, size)
+                self.bytes += size
+                while len(self._items) > self.max_entries or self.bytes > self.max_bytes:
+                    _, (_, evicted) = self._items.popitem(last=False)
+                    self.bytes -= evicted
+                    self.evictions += 1
+                    count("memo_eviction")
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def result_cache() -> ResultCache:
+    return ResultCache(
+        max_entries=int(setting("memo_max_entries", 256)),
+        max_bytes=int(float(setting("memo_max_mb", 256)) * 2**20),
+    )
@@ -0,0 +1,97 @@
+"""환자 차원 테이블 (환자별 한 줄).
+
+진료 기록을 환자번호 범주 코드(정수)로 한 번 훑어 환자마다 첫/마지막 진료, 진료 수,
+마지막 진료의 연령대·지역, 마지막으로 좌표가 있던 진료의 좌표를 모은다. 진료 기록은
+진료일자 순(같은 날은 시트 순서)이므로 '가장 앞/뒤 행'이 곧 첫/마지막 진료다.
+정렬이나 drop_duplicates 없이 코드별 최소/최대 행 번호만 구한다.
+
+장악도 페이지의 활성 환자 집계와 정확도, 환자정보 페이지의 조건 없는 환자수·지도
+좌표가 이 테이블의 컬럼 연산이 된다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.regions import REGION_COLS, RegionIndex
+
+LATEST_COLS = ['연령대', '시/도', '시/군/구', '행정동']
+
+
+def _patient_codes(ids: pd.Series):
+    """환자번호 → 0..n-1 코드와 코드별 환자번호. 빈 환자번호는 하나의 환자(마지막 코드)."""
+    if not isinstance(ids.dtype, pd.CategoricalDtype):
+        ids = ids.astype('category')
+    codes = ids.cat.codes.to_numpy().astype('int64')
+    labels = ids.cat.categories.astype(object).tolist() + [None]
+    codes[codes < 0] = len(labels) - 1
+    return codes, labels
+
+
+def _region_codes(frame: pd.DataFrame, regions: RegionIndex) -> np.ndarray:
+    """regions.encode 와 같은 값. 지역 조합은 많아야 수천 개라 범주 코드로 묶어 조합마다 한 번만."""
+    key = np.zeros(len(frame), dtype='int64')
+    for c in REGION_COLS:
+        col = frame[c]
+        if not isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype('category')
+        key = key * (len(col.cat.categories) + 1) + col.cat.codes.to_numpy() + 1
+    _, firsts, inverse = np.unique(key, return_index=True, return_inverse=True)
+    return regions.encode(frame.iloc[firsts])[inverse]
+
+
+class PatientTable:
+    def __init__(self, visits: pd.DataFrame, regions: RegionIndex):
+        codes, labels = _patient_codes(visits['환자번호'])
+        n = len(labels)
+        rows = np.arange(len(visits))
+        visit_count = np.bincount(codes, minlength=n)
+        first = np.full(n, len(visits), dtype='int64')
+        last = np.full(n, -1, dtype='int64')
+        np.minimum.at(first, codes, rows)
+        np.maximum.at(last, codes, rows)
+        # 좌표는 좌표가 있는 진료 중 마지막 것
+        y = visits['y'].to_numpy()
+        x = visits['x'].to_numpy()
+        located = ~(np.isnan(y) | np.isnan(x))
+        geo = np.full(n, -1, dtype='int64')
+        np.maximum.at(geo, codes[located], rows[located])
+
+        # 진료가 없는 코드(쓰이지 않은 범주, 빈 환자번호가 없을 때의 마지막 칸)는 뺀다
+        keep = visit_count > 0
+        first, last, geo = first[keep], last[keep], geo[keep]
+        has_geo = geo >= 0
+        dates = visits['진료일자']
+        frame = visits[LATEST_COLS].take(last).reset_index(drop=True)
+        frame.insert(0, '환자번호', np.asarray(labels, dtype=object)[keep])
+        frame.insert(1, '첫진료일', dates.take(first).to_numpy())
+        frame.insert(2, '마지막진료일', dates.take(last).to_numpy())
+        frame.insert(3, '진료수', visit_count[keep])
+        frame['지역코드'] = _region_codes(frame, regions)
+        frame['y'] = np.where(has_geo, y[np.where(has_geo, geo, 0)], np.nan).astype(y.dtype)
+        frame['x'] = np.where(has_geo, x[np.where(has_geo, geo, 0)], np.nan).astype(x.dtype)
+        self.frame = frame
+
+        # 마지막 진료에 행정동이 있는 환자 비율
+        self.acc = float((frame['행정동'] != "").mean()) if len(frame) else 0.0
+        self.first_date = dates.iloc[0] if len(dates) else None
+        self.last_date = dates.iloc[-1] if len(dates) else None
+        self.age_labels = visits['연령대'].cat.categories.tolist()
+        # 연령대가 빈 진료는 연령대 필터에 항상 걸러지므로, 있으면 '조건 없음'이 성립하지 않는다
+        self._all_aged = bool(visits['연령대'].notna().all())
+        self._points = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def covers(self, start_date, end_date, age_bands, gender) -> bool:
+        """사이드바 조건이 모든 진료를 고르는지. 그렇다면 환자별 값은 이 테이블에서 바로 읽는다."""
+        if self.first_date is None or gender != "전체" or not self._all_aged:
+            return False
+        return (pd.Timestamp(start_date) <= self.first_date
+                and pd.Timestamp(end_date) >= self.last_date.normalize()
+                and set(self.age_labels) <= set(age_bands))
+
+    def points(self) -> pd.DataFrame:
+        """좌표가 있는 환자별 좌표 하나씩 (y=위도, x=경도). geo.patient_points 와 같은 모양."""
+        if self._points is None:
+            self._points = self.frame[['y', 'x']].dropna().reset_index(drop=True)
+        return self._points
@@ -0,0 +1,108 @@
+"""지역 × 연령대 장악도(인구 대비 환자 비율) 팩트 테이블.
+
+인구현황은 로드 때 한 번 (지역코드, 연령대) 긴 형태로 펼쳐 둔다. 환자 쪽은
+환자별 마지막 진료일로 '최소 몇 개월 창이어야 활성인지'를 구해 (지역코드,
+연령대, 개월) 배열에 세고 개월 축으로 누적해 둔다. 그러면 슬라이더의 어떤
+개월 값이든 배열 한 면을 꺼내는 조회가 된다.
+
+전체 지역 순위는 행정동 코드 × (인구, 환자수) 행렬을 만든 뒤, 코드가 계층 순으로
+정렬돼 있는 점을 이용해 시/도, 시/군/구, 행정동 단계마다 reduceat 한 번으로 합친다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.preprocess import AGE_LABELS
+from core.regions import REGION_COLS, RegionIndex
+
+# 슬라이더 범위(6~24개월)를 넘어서는 오래된 환자는 이 칸에 모인다
+MAX_MONTHS = 25
+LEVELS = ['시/도', '시/군/구', '행정동']
+
+
+def population_long(pop: pd.DataFrame) -> pd.DataFrame:
+    """인구현황을 (지역코드, 시/도, 시/군/구, 행정동, 전체인구, 연령대, 인구수) 행으로."""
+    age_cols = [c for c in AGE_LABELS if c in pop.columns]
+    long = pop.melt(
+        id_vars=['지역코드', '시/도', '시/군/구', '행정동', '전체인구'],
+        value_vars=age_cols,
+        var_name='연령대',
+        value_name='인구수'
+    )
+    long['인구수'] = long['인구수'].fillna(0)
+    long['연령코드'] = pd.Categorical(long['연령대'], categories=AGE_LABELS).codes
+    return long.sort_values('지역코드', kind='stable', ignore_index=True)
+
+
+class ActivityTable:
+    """지역코드 × 연령대 × 활성 기간(개월)별 환자수 누적 배열."""
+
+    def __init__(self, patients: pd.DataFrame, today, n_regions: int):
+        """patients: 환자 차원 테이블 프레임 (마지막진료일, 지역코드, 연령대)."""
+        # 기존 기준 `진료일자 >= now - 30*months일` 과 같게: 경과일+1 을 30일 단위로 올림
+        days = (pd.Timestamp(today).normalize() - patients['마지막진료일']).dt.days.to_numpy()
+        need = np.clip(np.ceil((days + 1) / 30), 0, MAX_MONTHS).astype('int64')
+        # 코드 -1(지역/연령대 없음)은 0번 칸
+        region = patients['지역코드'].to_numpy().astype('int64') + 1
+        age = patients['연령대'].cat.codes.to_numpy().astype('int64') + 1
+        counts = np.zeros((n_regions + 1, len(AGE_LABELS) + 1, MAX_MONTHS + 1), dtype=np.int32)
+        np.add.at(counts, (region, age, need), 1)
+        self.counts = counts.cumsum(axis=2, dtype=np.int32)
+
+    def count(self, months: int = MAX_MONTHS, code_range=None) -> int:
+        """활성 환자수. code_range=None 이면 지역 미상 환자까지 전체."""
+        plane = self.counts[:, :, months]
+        if code_range is None:
+            return int(plane.sum())
+        lo, hi = code_range
+        return int(plane[lo + 1:hi + 1].sum())
+
+    def penetration(self, pop_long: pd.DataFrame, months: int) -> pd.DataFrame:
+        """인구 긴 테이블에 활성 환자수와 장악도(%)를 붙인 프레임."""
+        codes = pop_long['지역코드'].to_numpy() + 1
+        ages = pop_long['연령코드'].to_numpy() + 1
+        out = pop_long.assign(환자수=self.counts[codes, ages, months])
+        out['장악도(%)'] = (out['환자수'] / out['인구수'] * 100).round(2)
+        return out
+
+    def rollup(self, pop: pd.DataFrame, pop_long: pd.DataFrame, regions: RegionIndex, months: int) -> pd.DataFrame:
+        """모든 시/도, 시/군/구, 행정동의 인구, 활성 환자수, 장악도(%)와 연령대별 장악도(%).
+
+        컬럼: 단계, 시/도, 시/군/구, 행정동(상위 단계는 ""), 코드·끝코드(지역 코드 구간
+        [코드, 끝코드): 상위 지역은 하위 지역 구간을 포함), 인구수,
+        환자수, 장악도(%), 연령대별 장악도(%) 컬럼(연령대 라벨). 인구가 없는 지역
+        (환자 주소에만 있는 지역)은 뺀다. 전체 장악도는 KPI 카드와 같이 전체인구 대비
+        연령대 미상 환자까지 포함한 활성 환자수다.
+        """
+        n = len(regions.keys)
+        n_ages = len(AGE_LABELS)
+        # 행정동 코드별 [전체인구, 활성 환자수, 연령대별 인구..., 연령대별 환자수...]
+        matrix = np.zeros((n, 2 + 2 * n_ages), dtype='float64')
+        codes = pop['지역코드'].to_numpy()
+        ok = codes >= 0
+        np.add.at(matrix[:, 0], codes[ok], pop['전체인구'].to_numpy(dtype='float64', na_value=0)[ok])
+        plane = self.counts[1:, :, months]
+        matrix[:, 1] = plane.sum(axis=1)
+        matrix[:, 2 + n_ages:] = plane[:, 1:]
+        codes = pop_long['지역코드'].to_numpy()
+        ages = pop_long['연령코드'].to_numpy()
+        ok = (codes >= 0) & (ages >= 0)
+        np.add.at(matrix, (codes[ok], 2 + ages[ok]), pop_long['인구수'].to_numpy(dtype='float64')[ok])
+
+        frames = []
+        for depth, level in enumerate(LEVELS, start=1):
+            names, starts = regions.groups(depth)
+            sums = np.add.reduceat(matrix, starts, axis=0) if n else matrix
+            out = names.reindex(columns=REGION_COLS, fill_value="")
+            out.insert(0, '단계', level)
+            out['코드'] = starts
+            out['끝코드'] = np.append(starts[1:], n)
+            out['인구수'] = sums[:, 0].astype('int64')
+            out['환자수'] = sums[:, 1].astype('int64')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out['장악도(%)'] = sums[:, 1] / sums[:, 0] * 100
+                rates = sums[:, 2 + n_ages:] / sums[:, 2:2 + n_ages] * 100
+            for j, label in enumerate(AGE_LABELS):
+                out[label] = rates[:, j]
+            # 시/군/구가 없는 세종의 빈 이름 같은, 이 단계 이름이 빈 지역은 상위 단계와 같으므로 뺀다
+            frames.append(out[(out['인구수'] > 0) & (out[level] != "")])
+        return pd.concat(frames, ignore_index=True)
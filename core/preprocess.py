@@ -0,0 +1,117 @@
+"""시트 원본 프레임을 두 페이지가 공통으로 쓰는 형태로 가공."""
+import numpy as np
+import pandas as pd
+
+# 연령대 구간 (인구현황 시트의 컬럼명과 같은 라벨을 쓴다)
+AGE_BINS = list(range(0, 101, 10)) + [999]
+AGE_LABELS = ["9세이하"] + [f"{i}대" for i in range(10, 100, 10)] + ["100세이상"]
+
+# 시도 명칭 매핑
+province_map = {
+    '서울': '서울특별시', '인천': '인천광역시', '경기': '경기도', '광주': '광주광역시',
+    '부산': '부산광역시', '대구': '대구광역시', '대전': '대전광역시', '울산': '울산광역시',
+    '경남': '경상남도', '경북': '경상북도', '전남': '전라남도', '충북': '충청북도', '충남': '충청남도'
+}
+
+special_cities = {
+    "수원시","성남시","안양시","부천시","안산시",
+    "고양시","용인시","청주시","천안시",
+    "전주시","포항시","창원시"
+}
+
+
+def age_band(age: pd.Series) -> pd.Series:
+    return pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS, right=False)
+
+
+def hour_bucket(hms: pd.Series) -> pd.Series:
+    """진료시간(HHMMSS)을 'HH' 시간대 category 로. 결측은 '00'.
+
+    6자리 이하 정수는 정수 나눗셈으로 처리하고, 그 밖의 값(문자열, 7자리 이상
+    등)만 '6자리로 0 채운 뒤 앞 두 글자' 규칙을 문자열 연산으로 적용한다.
+    """
+    num = pd.to_numeric(hms, errors='coerce')
+    hour = (num // 10000).astype('float64')
+    odd = hms.notna() & ~num.between(0, 999_999)
+    if odd.any():
+        text = hms[odd].astype(str).str.zfill(6).str[:2]
+        hour[odd] = pd.to_numeric(text, errors='coerce')
+    hour = hour.fillna(0).astype('int64')
+    return pd.Series(
+        pd.Categorical(hour).rename_categories(lambda h: f"{h:02d}"),
+        index=hms.index,
+    )
+
+
+def split_addresses(addr: pd.Series) -> pd.DataFrame:
+    """인구현황 행정기관 주소를 시/도, 시/군/구, 행정동으로 분리.
+
+    - 세종특별자치시 + 행정동 (두 칸): 시/군/구는 ""
+    - 시/도 + 특례시 + 구 + 행정동 (네 칸, 예: 경기도 수원시 영통구 망포동)
+    - 시/도 + 시/군/구 + 행정동 (세 칸, 둘째 칸이 특례시가 아닐 때)
+    - 그 외는 세 컬럼 모두 None
+    """
+    n = addr.str.split().str.len()
+    # 네 칸보다 짧은 주소만 있으면 reindex 로 생긴 칸이 float(NaN) 이라 문자열과 못 더하므로 object 로
+    parts = addr.str.split(expand=True).reindex(columns=range(4)).astype(object)
+    special = parts[1].isin(special_cities)
+    sejong = (parts[0] == "세종특별자치시") & (n == 2)
+    four = (n == 4) & special & ~sejong
+    three = (n == 3) & ~special
+    out = pd.DataFrame(None, index=addr.index, columns=["시/도", "시/군/구", "행정동"], dtype=object)
+    ok = sejong | four | three
+    out.loc[ok, "시/도"] = parts.loc[ok, 0]
+    out.loc[sejong, "시/군/구"] = ""
+    out.loc[sejong, "행정동"] = parts.loc[sejong, 1]
+    out.loc[four, "시/군/구"] = parts.loc[four, 1] + " " + parts.loc[four, 2]
+    out.loc[four, "행정동"] = parts.loc[four, 3]
+    out.loc[three, "시/군/구"] = parts.loc[three, 1]
+    out.loc[three, "행정동"] = parts.loc[three, 2]
+    return out
+
+
+def preprocess_visits(df: pd.DataFrame) -> pd.DataFrame:
+    """진료 기록: 진료일자 파싱, 시도명 정규화, 연령대/진료시간대/행정기관 컬럼 추가.
+
+    결과는 진료일자 순(같은 날은 시트 순서)으로 정렬돼 있어 기간 필터가 이진 탐색이 된다.
+    """
+    df = df.copy()
+    df['진료일자'] = pd.to_datetime(df['진료일자'], format='%Y%m%d')
+    df = df.sort_values('진료일자', kind='stable', ignore_index=True)
+    df['연령대'] = age_band(df['나이'])
+    df['진료시간대'] = hour_bucket(df['진료시간'])
+    # 시도명 매핑
+    df['시/도'] = df['시/도'].map(province_map).fillna(df['시/도'])
+    # full 행정동 생성 (예: '경기도 시흥시 월곶동')
+    df['행정기관'] = np.where(
+        df['시/도'] == '세종특별자치시',
+        # 세종일 경우: 시/도 + 행정동
+        df['시/도'] + ' ' + df['행정동'],
+        # 그 외: 시/도 + 시/군/구 + 행정동
+        df['시/도'] + ' ' + df['시/군/구'] + ' ' + df['행정동']
+    )
+    return df
+
+
+def to_number(col: pd.Series) -> pd.Series:
+    """'1,234' 같은 천 단위 구분 문자열도 숫자로 (변환 불가는 NaN)."""
+    if pd.api.types.is_numeric_dtype(col):
+        return col
+    return pd.to_numeric(col.astype(str).str.replace(',', ''), errors='coerce')
+
+
+def preprocess_population(pop: pd.DataFrame) -> pd.DataFrame:
+    """인구현황: 행정기관 주소를 시/도, 시/군/구, 행정동으로 분리하고 인구수를 숫자로."""
+    split_df = split_addresses(pop["행정기관"])
+
+    df = pd.concat([pop, split_df], axis=1)
+
+    df = df[df["시/도"].notna()]
+
+    # 연령대 컬럼 식별
+    age_cols = [c for c in df.columns if c not in ['시/도', '시/군/구', '행정동', '행정기관', '행정기관코드','총 인구수', '연령구간인구수']]
+    if '총 인구수' in df.columns:
+        df = df.rename(columns={'총 인구수':'전체인구'})
+    df = df.assign(**{c: to_number(df[c]) for c in age_cols + ['전체인구']})
+    # pop: 행정동(예: '경기도 시흥시 월곶동') + 연령대별 인구수 + 전체인구
+    return df[['행정기관'] + ['시/도'] + ['시/군/구'] + ['행정동'] + age_cols + ['전체인구']]
@@ -0,0 +1,71 @@
+"""백그라운드 데이터 갱신과 데이터 버전 교체.
+
+갱신 스레드가 주기적으로 새 데이터셋(시트 동기화 + 파생 구조 전부)을 요청 경로
+밖에서 만들고, 다 만들어지면 참조 하나를 바꿔 끼워 게시한다. 세션들은 매 rerun
+시작 때 `current()` 로 그 시점의 데이터셋을 한 번 잡아 끝까지 쓰므로, 한 화면
+안에서 버전이 섞이지 않는다.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class DataStore:
+    def __init__(self, build):
+        """build(previous, progress=None) -> 새 데이터셋, 또는 바뀐 게 없으면 None.
+
+        progress 는 첫 로드를 기다리는 요청 스레드에서만 넘어오는 진행 표시 콜백이다.
+        """
+        self._build = build
+        self._lock = threading.Lock()
+        self._current = None
+        self._thread = None
+        self.last_error = None
+        # 마지막으로 시트 변경 여부를 확인한 시각 (변경이 없어도 갱신)
+        self.checked_at = None
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    def current(self, progress=None):
+        if self._current is None:
+            # 첫 로드만 요청 경로에서 (동시에 들어온 세션은 같은 빌드를 기다림)
+            with self._lock:
+                if self._current is None:
+                    self._current = self._build(None, progress)
+                    self.checked_at = datetime.now()
+        return self._current
+
+    def refresh(self) -> bool:
+        """새 데이터셋을 만들어 게시. 바뀐 게 없으면 False."""
+        with self._lock:
+            dataset = self._build(self._current)
+            self.checked_at = datetime.now()
+            if dataset is None:
+                return False
+            self._current = dataset
+        logger.info("data version %s published", dataset.version)
+        return True
+
+    def start(self, interval_seconds: float):
+        if self._thread is not None or interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="data-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, interval_seconds):
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # 갱신 실패 시 기존 버전을 계속 쓴다
+                logger.exception("background refresh failed")
+                self.last_error = e
@@ -0,0 +1,85 @@
+"""시/도 → 시/군/구 → 행정동 계층 인덱스.
+
+(시/도, 시/군/구, 행정동) 조합마다 정렬 순서대로 정수 코드를 매겨 두면, 한 시/도나
+시/군/구에 속한 행정동 코드는 연속된 구간이 된다. 지역 필터는 문자열 비교 대신
+`lo <= 코드 < hi` 정수 비교가 되고, 드롭다운 목록은 미리 만든 트리에서 바로 꺼낸다.
+"""
+import numpy as np
+import pandas as pd
+
+REGION_COLS = ['시/도', '시/군/구', '행정동']
+
+
+class RegionIndex:
+    def __init__(self, pop: pd.DataFrame, extra: pd.DataFrame = None):
+        """드롭다운 트리는 인구현황(pop) 기준, 코드는 pop 과 extra(환자 주소 등)의 합집합."""
+        frames = [pop[REGION_COLS]]
+        if extra is not None:
+            frames.append(extra[REGION_COLS])
+        keys = (
+            pd.concat([f.astype(object) for f in frames], ignore_index=True)
+            .dropna()
+            .drop_duplicates()
+            .sort_values(REGION_COLS, ignore_index=True)
+        )
+        self.keys = keys
+        self._index = pd.MultiIndex.from_frame(keys)
+
+        # 지역(시/도, 시/군/구, 행정동 단계별) → 코드 구간 [lo, hi)
+        self._ranges = {}
+        # 단계별 지역 시작 코드 (전체 지역 순위의 구간 합에 씀)
+        self._starts = {}
+        for depth in (1, 2, 3):
+            cols = REGION_COLS[:depth]
+            starts = np.flatnonzero(~keys.duplicated(cols).to_numpy())
+            self._starts[depth] = starts
+            ends = np.append(starts[1:], len(keys))
+            names = keys[cols].to_numpy()[starts]
+            for name, lo, hi in zip(names, starts, ends):
+                self._ranges[tuple(name)] = (int(lo), int(hi))
+
+        # 드롭다운용 트리: 인구현황에 있는 지역만
+        tree = {}
+        pop_keys = pop[REGION_COLS].dropna().drop_duplicates().sort_values(REGION_COLS)
+        for province, city, dong in pop_keys.itertuples(index=False):
+            tree.setdefault(province, {}).setdefault(city, []).append(dong)
+        self.tree = tree
+
+    def children(self, province: str = None, city: str = None) -> list:
+        """하위 지역 목록 (정렬됨)."""
+        if province is None:
+            return list(self.tree)
+        cities = self.tree.get(province, {})
+        if city is None:
+            return list(cities)
+        return list(cities.get(city, []))
+
+    def groups(self, depth: int):
+        """depth 단계(1=시/도, 2=시/군/구, 3=행정동) 지역들의 이름 프레임과 시작 코드 배열.
+
+        코드가 계층 순으로 정렬돼 있으므로 np.add.reduceat(값, starts) 가 지역별 합이다.
+        """
+        starts = self._starts[depth]
+        return self.keys.iloc[starts][REGION_COLS[:depth]].reset_index(drop=True), starts
+
+    def encode(self, frame: pd.DataFrame) -> np.ndarray:
+        """프레임의 (시/도, 시/군/구, 행정동) → 코드. 인덱스에 없는 조합은 -1."""
+        keys = pd.MultiIndex.from_arrays([frame[c].astype(object) for c in REGION_COLS])
+        return self._index.get_indexer(keys).astype('int32')
+
+    def code_range(self, province, city, dong):
+        """선택한 지역의 코드 구간 [lo, hi). "전체"는 상위 단계까지만 본다."""
+        if province == "전체":
+            return 0, len(self.keys)
+        if city == "전체":
+            return self._ranges.get((province,), (0, 0))
+        if dong == "전체":
+            return self._ranges.get((province, city), (0, 0))
+        return self._ranges.get((province, city, dong), (0, 0))
+
+    def mask(self, codes, province, city, dong) -> np.ndarray:
+        if province == "전체":
+            return np.ones(len(codes), dtype=bool)
+        lo, hi = self.code_range(province, city, dong)
+        codes = np.asarray(codes)
+        return (codes >= lo) & (codes < hi)
@@ -0,0 +1,48 @@
+"""진료 기록 프레임의 메모리 절약형 컬럼 타입.
+
+`get_all_records()` 결과는 문자열 컬럼이 전부 파이썬 객체로, 나이는 int64 로,
+빈 칸이 섞인 좌표는 str/float 혼합으로 들어온다. 워커마다 이 프레임을 들고
+있으므로 로드 직후 한 번 타입을 좁힌다.
+"""
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+VISIT_SCHEMA = {
+    # 반복이 많은 문자열 → category (코드는 int8/int16/int32 로 자동 결정)
+    '환자번호': 'category',
+    '성별': 'category',
+    '초/재진': 'category',
+    '시/도': 'category',
+    '시/군/구': 'category',
+    '행정동': 'category',
+    '행정기관': 'category',
+    # 작은 정수 (결측 허용)
+    '나이': 'Int16',
+    '진료시간': 'Int32',
+    # 좌표: 빈 칸은 NaN
+    'x': 'float32',
+    'y': 'float32',
+}
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _cast(col: pd.Series, dtype: str) -> pd.Series:
+    if dtype.startswith('float') or dtype.startswith('Int'):
+        # "" 등 숫자가 아닌 값은 결측으로
+        col = pd.to_numeric(col.replace("", None), errors='coerce')
+    return col.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema=VISIT_SCHEMA, name: str = "visits"):
+    """스키마에 있는 컬럼만 변환한 새 프레임과 (변환 전, 후) 바이트 수를 돌려준다."""
+    before = memory_usage(df)
+    out = df.assign(**{c: _cast(df[c], t) for c, t in schema.items() if c in df.columns})
+    after = memory_usage(out)
+    logger.info("%s: %.1f MB -> %.1f MB (%d rows)", name, before / 2**20, after / 2**20, len(out))
+    return out, (before, after)
@@ -0,0 +1,98 @@
+"""Google Sheets 접속. 인증된 클라이언트는 프로세스 안에서 하나만 만든다.
+
+큰 워크시트는 `fetch_columns` 로 행 구간(A1 범위)별로 나눠 동시에 받고,
+할당량 초과(429)나 일시적 서버 오류는 지수 백오프로 재시도한다 (스프레드시트·워크시트를
+여는 메타데이터 요청과 헤더 읽기도 같은 `call_with_retry` 를 거친다). 받은 구간은
+순서대로 컬럼 버퍼에 바로 옮기므로 전체 응답이나 행별 dict 를 들고 있지 않는다.
+워크시트 객체는 `get(range)` 와 `row_count` 만 쓰므로 가짜 객체로 바꿔 시험할 수 있다.
+"""
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import gspread
+import requests
+import streamlit as st
+from gspread.utils import rowcol_to_a1
+
+from core.config import setting
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def get_client():
+    return gspread.service_account_from_dict(st.secrets["gcp_service_account"])
+
+
+@st.cache_resource
+def get_spreadsheet():
+    return call_with_retry(get_client().open_by_key, st.secrets["google_sheets"]["sheet_id"])
+
+
+def open_worksheet(name: str):
+    return call_with_retry(get_spreadsheet().worksheet, name)
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, gspread.exceptions.APIError):
+        return exc.code == 429 or exc.code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def call_with_retry(fn, *args, retries: int = None, backoff: float = None):
+    """fn(*args) 를 일시적 오류에 한해 지수 백오프(+지터)로 재시도."""
+    retries = int(setting("fetch_retries", 5)) if retries is None else retries
+    backoff = float(setting("fetch_backoff_seconds", 1.0)) if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if attempt == retries or not _is_transient(e):
+                raise
+            delay = backoff * 2 ** attempt * (1 + random.random())
+            logger.warning("%s%r: %s, %.1fs 후 재시도 (%d/%d)",
+                           getattr(fn, "__name__", fn), args, e, delay, attempt + 1, retries)
+            time.sleep(delay)
+
+
+def fetch_columns(ws, width: int, start_row: int = 2, chunk_rows: int = None, max_workers: int = None):
+    """start_row 행부터 시트 끝까지를 컬럼별 문자열 리스트(width 개)로.
+
+    구간 사이의 빈 행은 자리를 지키도록 빈 칸으로 채우고, 끝쪽 빈 행은 버린다.
+    """
+    chunk_rows = int(setting("fetch_chunk_rows", 10000)) if chunk_rows is None else chunk_rows
+    max_workers = int(setting("fetch_workers", 4)) if max_workers is None else max_workers
+    last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+    last_row = max(ws.row_count, start_row)
+    starts = iter(range(start_row, last_row + 1, chunk_rows))
+
+    columns = [[] for _ in range(width)]
+    pending_blank = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # 동시에 떠 있는 요청은 max_workers*2 개까지만 (메모리와 할당량 보호)
+        in_flight = deque()
+
+        def submit():
+            r = next(starts, None)
+            if r is not None:
+                end = min(r + chunk_rows - 1, last_row)
+                in_flight.append((end - r + 1, pool.submit(call_with_retry, ws.get, f"A{r}:{last_col}{end}")))
+
+        for _ in range(max_workers * 2):
+            submit()
+        while in_flight:
+            size, future = in_flight.popleft()
+            rows = future.result()
+            submit()
+            if rows:
+                for col in columns:
+                    col.extend([""] * pending_blank)
+                pending_blank = 0
+                for j, col in enumerate(columns):
+                    col.extend(r[j] if j < len(r) else "" for r in rows)
+            # API 는 구간 끝의 빈 행을 잘라서 주므로 모자란 만큼은 보류해 둔다
+            pending_blank += size - len(rows)
+    return columns
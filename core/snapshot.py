@@ -0,0 +1,182 @@
+"""Google Sheets 워크시트의 로컬 Parquet 스냅샷.
+
+첫 로드 때 시트 전체를 받아 타입이 정해진 컬럼으로 Parquet 에 저장하고,
+이후에는 마지막 동기화 이후 시트 아래쪽에 추가된 행만 받아 이어 붙인다.
+증분 동기화가 알아채는 변경은 헤더와 기존 마지막 행뿐이다 (행 삭제/삽입으로 마지막
+행이 달라지거나 헤더가 바뀌면 전체를 다시 받음). 그보다 앞 행의 값 수정(주소, 나이
+정정 등)은 증분 동기화로는 보이지 않으므로, `snapshot_full_sync_hours`(기본 24시간,
+0 이면 끔)마다 전체를 다시 받아 반영한다. 그 사이에는 수정 전 값이 보일 수 있다.
+주기적 전체 재로드는 백그라운드 갱신에서만 한다: 재시작 후 첫 로드(요청 경로)는 기한이
+지났어도 증분 동기화로 끝내고, 밀린 전체 재로드는 다음 갱신이 맡는다.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+from core.config import cache_dir, setting
+from core.sheets import call_with_retry, fetch_columns
+
+# 같은 스냅샷을 여러 세션이 동시에 동기화하지 않도록 스냅샷 이름마다 잠금
+# (다른 시트는 동시에 동기화된다)
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(name: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def _paths(name: str):
+    base = cache_dir() / "snapshots"
+    base.mkdir(parents=True, exist_ok=True)
+    return base / f"{name}.parquet", base / f"{name}.json"
+
+
+def typed_column(values: pd.Series) -> pd.Series:
+    """문자열 셀 값을 get_all_records 와 같은 규칙(숫자로 읽히면 숫자)으로 변환."""
+    blank = values == ""
+    if blank.all():
+        return values
+    numeric = pd.to_numeric(values.where(~blank), errors="coerce")
+    if numeric.notna().sum() != (~blank).sum():
+        # 숫자가 아닌 값이 섞인 컬럼은 문자열 그대로 둔다
+        return values
+    if not blank.any() and (numeric % 1 == 0).all():
+        return numeric.astype("int64")
+    return numeric.astype("float64")
+
+
+def records_frame(header, columns) -> pd.DataFrame:
+    """컬럼별 시트 값(문자열 리스트)을 컬럼 단위로 타입을 맞춘 DataFrame 으로."""
+    return pd.DataFrame({
+        name: typed_column(pd.Series(col, dtype=object))
+        for name, col in zip(header, columns)
+    })
+
+
+def _read_meta(meta_path):
+    if not meta_path.exists():
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def snapshot_meta(name: str):
+    """마지막 동기화 정보 (header, rows, last_row, high_water, synced_at, full_synced_at). 없으면 None."""
+    return _read_meta(_paths(name)[1])
+
+
+def _write(frame, meta, data_path, meta_path):
+    # 쓰는 도중 죽어도 기존 스냅샷이 깨지지 않도록 임시 파일 후 교체
+    tmp_data = data_path.with_suffix(".parquet.tmp")
+    frame.to_parquet(tmp_data, index=False)
+    os.replace(tmp_data, data_path)
+    tmp_meta = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+
+
+def _concat(base: pd.DataFrame, header, appended):
+    """기존 스냅샷 + 추가분(컬럼별 시트 문자열)을 전체 재로드와 같은 타입 규칙으로 합친다.
+
+    문자열로 저장된 컬럼은 시트 값 그대로이므로 문자열끼리 이어 붙인다 (모두 빈 칸이던 컬럼은
+    합친 값으로 타입을 다시 정함). 숫자로 저장된 컬럼에 숫자가 아닌 값이 추가되면 원래 문자열을
+    되살릴 수 없으므로(예: 100001 → "100001.0") None: 호출한 쪽이 전체를 다시 받는다.
+    """
+    new = records_frame(header, appended)
+    out = {}
+    for c, raw in zip(header, appended):
+        a, b = base[c], new[c]
+        if pd.api.types.is_numeric_dtype(a):
+            if pd.api.types.is_numeric_dtype(b):
+                if a.dtype != b.dtype:
+                    a, b = a.astype("float64"), b.astype("float64")
+            elif (b == "").all():
+                b = pd.Series(float("nan"), index=b.index)
+            else:
+                return None
+            out[c] = pd.concat([a, b], ignore_index=True)
+            continue
+        values = pd.concat([a.astype(object), pd.Series(raw, dtype=object)], ignore_index=True)
+        out[c] = typed_column(values) if (a == "").all() else values
+    return pd.DataFrame(out)
+
+
+def load_snapshot(name: str) -> pd.DataFrame:
+    return pd.read_parquet(_paths(name)[0])
+
+
+def _high_water(frame, date_col):
+    if date_col is None or date_col not in frame.columns or frame.empty:
+        return None
+    return str(frame[date_col].max())
+
+
+def _full_sync_due(meta) -> bool:
+    """마지막 전체 재로드 후 snapshot_full_sync_hours 가 지났는지."""
+    hours = float(setting("snapshot_full_sync_hours", 24))
+    if hours <= 0:
+        return False
+    # 이 항목이 없는 예전 스냅샷은 한 번 전체 재로드
+    last = meta.get("full_synced_at")
+    return last is None or (datetime.now() - datetime.fromisoformat(last)).total_seconds() >= hours * 3600
+
+
+def sync_snapshot(ws, name: str, date_col: str = None, periodic_reload: bool = True):
+    """워크시트 `ws` 를 로컬 스냅샷 `name` 과 동기화한다.
+
+    새로 받거나 이어 붙인 전체 프레임을 돌려주고, 바뀐 게 없으면 스냅샷 파일을 읽지 않고
+    None 을 돌려준다 (필요하면 `load_snapshot`). periodic_reload=False 면 주기적 전체 재로드
+    기한이 지났어도 증분 동기화만 한다.
+    """
+    with _lock(name):
+        return _sync(ws, name, date_col, periodic_reload)
+
+
+def _sync(ws, name, date_col, periodic_reload=True):
+    data_path, meta_path = _paths(name)
+    meta = _read_meta(meta_path)
+    header = call_with_retry(ws.row_values, 1)
+
+    if meta is not None and data_path.exists() and meta["header"] == header \
+            and not (periodic_reload and _full_sync_due(meta)):
+        n = meta["rows"]
+        # 기존 마지막 행(헤더가 1행이므로 n+1행)부터 끝까지:
+        # 첫 행은 변경 감지용, 나머지가 추가분
+        tail = fetch_columns(ws, len(header), start_row=n + 1)
+        if tail[0] and [c[0] for c in tail] == meta["last_row"]:
+            appended = [c[1:] for c in tail]
+            if not appended[0]:
+                # 추가분이 없으면 스냅샷 파일도 읽지 않는다
+                return None
+            frame = _concat(pd.read_parquet(data_path), header, appended)
+            # None: 숫자 컬럼에 숫자가 아닌 값이 추가됨 → 아래에서 전체 재로드
+            if frame is not None:
+                meta.update(
+                    rows=n + len(appended[0]),
+                    last_row=[c[-1] for c in appended],
+                    high_water=_high_water(frame, date_col),
+                    synced_at=datetime.now().isoformat(timespec="seconds"),
+                )
+                _write(frame, meta, data_path, meta_path)
+                return frame
+
+    # 스냅샷이 없거나 시트 구조/추가분 타입이 바뀌었거나 주기적 전체 재로드 때
+    columns = fetch_columns(ws, len(header), start_row=2)
+    frame = records_frame(header, columns)
+    now = datetime.now().isoformat(timespec="seconds")
+    meta = {
+        "header": header,
+        "rows": len(frame),
+        # 데이터 행이 없으면 헤더 행(1행)이 변경 감지 기준이 된다
+        "last_row": [c[-1] for c in columns] if len(frame) else header,
+        "high_water": _high_water(frame, date_col),
+        "synced_at": now,
+        "full_synced_at": now,
+    }
+    _write(frame, meta, data_path, meta_path)
+    return frame
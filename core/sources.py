@@ -0,0 +1,171 @@
+"""시트 데이터 공급원.
+
+- SheetsSource: Google Sheets + 로컬 Parquet 스냅샷 (기본)
+- LocalSource: 내려받아 둔 CSV/XLSX/Parquet 파일 (네트워크 없이 실행, 부하/성능 측정용)
+
+둘 다 `connect()` 뒤 `read(name, date_col, known)` 로 (원본 프레임, 변경 감지용 지문)을 돌려준다.
+지문은 프레임을 만들기 전에 정해지고, 직전 지문(known)과 같으면 프레임 없이 (None, 지문)
+이다 (주기적 갱신이 바뀐 게 없을 때 파일 전체를 다시 읽지 않도록). periodic_reload 는
+스냅샷의 주기적 전체 재로드를 허용할지(첫 로드는 False). 두 공급원 모두
+셀 값은 같은 규칙(core.snapshot.typed_column)으로 타입을 맞추므로 이후 전처리는
+공급원과 상관없이 같다. `data_source` 설정이 "local" 이면 `local_data_path`
+(파일들이 있는 디렉터리, 또는 시트별 탭이 있는 .xlsx 하나)에서 읽는다.
+"""
+import csv as stdcsv
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from core.config import ROOT_DIR, setting
+from core.snapshot import load_snapshot, records_frame, snapshot_meta, sync_snapshot, typed_column
+
+CSV_BLOCK_BYTES = 16 << 20
+
+
+class SheetsSource:
+    def connect(self):
+        """인증된 스프레드시트 세션을 미리 연다 (여러 시트를 동시에 읽을 때 하나를 같이 쓰도록)."""
+        from core.sheets import get_spreadsheet
+
+        get_spreadsheet()
+
+    def read(self, name: str, date_col: str = None, known=None, periodic_reload: bool = True):
+        from core.sheets import open_worksheet
+
+        ws = open_worksheet(name)
+        frame = sync_snapshot(ws, ws.title, date_col=date_col, periodic_reload=periodic_reload)
+        meta = snapshot_meta(ws.title)
+        # 스냅샷의 행 수와 마지막으로 바뀐 시각: 같으면 데이터도 같다
+        key = (meta["rows"], meta["synced_at"])
+        if key == known:
+            return None, key
+        return (frame if frame is not None else load_snapshot(ws.title)), key
+
+
+def _cell_text(value) -> str:
+    # 엑셀 셀 값을 시트 표시 값처럼 문자열로
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y%m%d")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# pyarrow 가 pandas 와 똑같이 숫자로 읽는 형태만 (부호 "+", 앞뒤 공백 등은 pandas 규칙으로)
+_NUMBER = r"^-?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+_INTEGER = r"^-?\d+$"
+
+
+def _typed_arrow(values) -> pd.Series:
+    """Arrow 문자열 컬럼에 typed_column 과 같은 규칙을 파이썬 문자열 없이 적용한다."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    blank = pc.equal(values, "")
+    blanks = pc.sum(blank).as_py() or 0
+    if blanks == len(values):
+        return values.to_pandas()
+    filled = values.filter(pc.invert(blank))
+    odd = pc.unique(filled.filter(pc.invert(pc.match_substring_regex(filled, _NUMBER))))
+    if len(odd):
+        if pd.to_numeric(odd.to_pandas(), errors="coerce").isna().any():
+            # 숫자가 아닌 값이 섞인 컬럼은 문자열 그대로 둔다
+            return values.to_pandas()
+        return typed_column(values.to_pandas())
+    if not blanks and pc.all(pc.match_substring_regex(values, _INTEGER)).as_py():
+        try:
+            return pc.cast(values, pa.int64()).to_pandas()
+        except pa.ArrowInvalid:
+            # int64 범위를 넘는 값
+            return typed_column(values.to_pandas())
+    numeric = pc.cast(pc.if_else(blank, pa.scalar(None, pa.string()), values), pa.float64()).to_pandas()
+    if not blanks and (numeric % 1 == 0).all():
+        return numeric.astype("int64")
+    return numeric.astype("float64")
+
+
+class LocalSource:
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def _file(self, name: str) -> Path:
+        if self.path.suffix == ".xlsx":
+            return self.path
+        for suffix in (".parquet", ".csv", ".xlsx"):
+            candidate = self.path / f"{name}{suffix}"
+            if candidate.exists():
+                return candidate
+        raise FileNotFoundError(f"{self.path} 에 {name}.parquet/.csv/.xlsx 가 없습니다")
+
+    def connect(self):
+        pass
+
+    def read(self, name: str, date_col: str = None, known=None, periodic_reload: bool = True):
+        path = self._file(name)
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime)
+        if key == known:
+            return None, key
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path)
+        elif path.suffix == ".csv":
+            frame = self._read_csv(path)
+        else:
+            frame = self._read_xlsx(path, name)
+        return frame, key
+
+    @staticmethod
+    def _read_csv(path):
+        import pyarrow as pa
+        from pyarrow import csv
+
+        with open(path, encoding="utf-8-sig") as f:
+            header = next(stdcsv.reader(f), [])
+        # 모든 컬럼을 문자열로 블록 단위 스트리밍 → Arrow 그대로 컬럼별로 시트와 같은 타입 규칙 적용
+        reader = csv.open_csv(
+            path,
+            read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES, skip_rows=1, column_names=header),
+            convert_options=csv.ConvertOptions(
+                column_types={c: pa.string() for c in header}, strings_can_be_null=False
+            ),
+        )
+        table = pa.Table.from_batches(reader, schema=reader.schema)
+        return pd.DataFrame({name: _typed_arrow(table.column(i)) for i, name in enumerate(header)})
+
+    @staticmethod
+    def _read_xlsx(path, name):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[name] if name in wb.sheetnames else wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = [_cell_text(v) for v in next(rows, ())]
+            while header and header[-1] == "":
+                header.pop()
+            columns = [[] for _ in header]
+            # 행 단위로 읽으면서 바로 컬럼 버퍼에 쌓는다 (read_only 는 시트를 메모리에 다 올리지 않음)
+            pending_blank = 0
+            for row in rows:
+                cells = [_cell_text(v) for v in row[:len(header)]]
+                if not any(cells):
+                    pending_blank += 1
+                    continue
+                cells += [""] * (len(header) - len(cells))
+                for col, cell in zip(columns, cells):
+                    col.extend([""] * pending_blank)
+                    col.append(cell)
+                pending_blank = 0
+        finally:
+            wb.close()
+        return records_frame(header, columns)
+
+
+def get_source():
+    if setting("data_source", "sheets") == "local":
+        # 상대 경로는 저장소 루트 기준
+        return LocalSource(ROOT_DIR / setting("local_data_path", "data"))
+    return SheetsSource()
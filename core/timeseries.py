@@ -0,0 +1,119 @@
+"""일별 내원수 시계열 엔진.
+
+필터 조합(연령대, 성별)마다 데이터 전체 기간의 빈틈없는 달력 위에 일별 건수와
+누적합을 한 번 만들어 두면, 기간 합계·이동평균·전년 동기 값은 누적합 두 칸의 차로
+점마다 O(1) 에 나온다. 날짜 범위를 바꾸거나 넓혀도 다시 집계하지 않고 배열을 자르기만
+한다. 배열은 데이터 버전(Dataset)에 붙어 있어 새 버전이 나오면 함께 버려진다.
+
+이동평균은 기존 `rolling(window, min_periods=1)` 과 같은 뜻이다: 창은 달력 일수가
+아니라 '내원이 있었던 날' 개수이고, 조회 시작일 이전 날은 창에 넣지 않는다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MA_WINDOWS = (6, 30, 60, 90)
+MAX_SLICES = 32
+
+
+class DailySeries:
+    """한 필터 조합의 일별 건수 (달력 전체, 빈 날은 0)."""
+
+    def __init__(self, calendar: pd.DatetimeIndex, counts: np.ndarray):
+        self.calendar = calendar
+        self.counts = counts
+        self.cum = np.concatenate([[0], np.cumsum(counts)])
+        # 내원이 있었던 날만의 위치와 누적합 (이동평균 창은 이 날들 기준)
+        self.visit_days = np.flatnonzero(counts)
+        self.visit_cum = np.concatenate([[0], np.cumsum(counts[self.visit_days])])
+
+    def _bounds(self, start, end):
+        """start~end(양끝 포함) 의 달력 위치 [lo, hi)."""
+        dates = self.calendar.to_numpy()
+        lo = np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side='left')
+        hi = np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side='right')
+        return int(lo), int(max(hi, lo))
+
+    def total(self, start, end) -> int:
+        lo, hi = self._bounds(start, end)
+        return int(self.cum[hi] - self.cum[lo])
+
+    def _visit_rows(self, start, end):
+        lo, hi = self._bounds(start, end)
+        return (int(np.searchsorted(self.visit_days, lo, side='left')),
+                int(np.searchsorted(self.visit_days, hi, side='left')))
+
+    def daily(self, start, end) -> pd.DataFrame:
+        """내원이 있었던 날의 (진료일자, 환자수). cube.daily_counts 와 같은 모양."""
+        r0, r1 = self._visit_rows(start, end)
+        days = self.visit_days[r0:r1]
+        return pd.DataFrame({'진료일자': self.calendar[days], '환자수': self.counts[days]})
+
+    def moving_averages(self, start, end, windows=MA_WINDOWS) -> pd.DataFrame:
+        """daily() 에 MA{w} 컬럼을 더한 프레임 (창은 내원일 개수, 조회 시작일에서 잘림)."""
+        r0, r1 = self._visit_rows(start, end)
+        out = self.daily(start, end)
+        rows = np.arange(r0, r1)
+        for w in windows:
+            first = np.maximum(rows - w + 1, r0)
+            out[f'MA{w}'] = (self.visit_cum[rows + 1] - self.visit_cum[first]) / (rows + 1 - first)
+        return out
+
+    def year_over_year(self, start, end) -> pd.DataFrame:
+        """조회 기간과 전년 동기 일별 건수를 한 프레임으로 (전년 날짜는 1년 뒤로 옮긴 plot_date).
+
+        컬럼: plot_date, 환자수, year_group('조회 기간'/'전년 동기'), 진료일자(실제 날짜).
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        curr = self.daily(start, end)
+        ly = self.daily(start - pd.DateOffset(years=1), end - pd.DateOffset(years=1))
+        curr.insert(0, 'plot_date', curr['진료일자'])
+        ly.insert(0, 'plot_date', ly['진료일자'] + pd.DateOffset(years=1))
+        curr['year_group'] = '조회 기간'
+        ly['year_group'] = '전년 동기'
+        columns = ['plot_date', '환자수', 'year_group', '진료일자']
+        return pd.concat([curr[columns], ly[columns]])
+
+
+class TimeSeriesEngine:
+    """집계 큐브에서 필터 조합별 DailySeries 를 만들어 최근 MAX_SLICES 개를 들고 있는다."""
+
+    def __init__(self, cube: pd.DataFrame):
+        dates = cube['진료일자']
+        if len(dates):
+            origin = dates.iloc[0]
+            n_days = (dates.iloc[-1] - origin).days + 1
+        else:
+            origin, n_days = pd.Timestamp('1970-01-01'), 0
+        self.calendar = pd.date_range(origin, periods=n_days, freq='D')
+        # 큐브 행 → 달력 위치 (큐브는 진료일자로 정렬돼 있다)
+        self._day = ((dates - origin).dt.days.to_numpy().astype('int64')
+                     if len(dates) else np.empty(0, dtype='int64'))
+        self._ages = cube['연령대']
+        self._genders = cube['성별']
+        self._counts = cube['진료수'].to_numpy()
+        self._slices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def series(self, age_bands=None, gender="전체") -> DailySeries:
+        """연령대 목록(None 이면 전체)과 성별 조건의 시계열."""
+        key = (None if age_bands is None else tuple(sorted(age_bands)), gender)
+        with self._lock:
+            if key in self._slices:
+                self._slices.move_to_end(key)
+                return self._slices[key]
+        mask = np.ones(len(self._counts), dtype=bool)
+        if age_bands is not None:
+            mask &= self._ages.isin(age_bands).to_numpy()
+        if gender != "전체":
+            mask &= (self._genders == gender).to_numpy()
+        counts = np.bincount(self._day[mask], weights=self._counts[mask],
+                             minlength=len(self.calendar)).astype('int64')
+        series = DailySeries(self.calendar, counts)
+        with self._lock:
+            self._slices[key] = series
+            while len(self._slices) > MAX_SLICES:
+                self._slices.popitem(last=False)
+        return series
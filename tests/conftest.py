@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.synthetic import visit_sheet
+from core.preprocess import AGE_LABELS, preprocess_visits
+from core.schema import apply_schema
+
+# 기간 안에 윤일(2024-02-29)과 연말연초가 들어가도록 끝 날짜를 고정
+VISIT_END = "2025-03-15"
+
+# 사이드바 필터 (시작일, 종료일, 연령대, 성별)
+FILTERS = [
+    ("2022-03-16", "2025-03-15", AGE_LABELS, "전체"),
+    # 윤일을 지나는 기간 (전년 동기는 2023-02)
+    ("2024-02-01", "2024-03-31", ["20대", "30대", "40대"], "여"),
+    ("2023-12-20", "2024-01-10", AGE_LABELS, "남"),
+    ("2025-03-10", "2025-03-15", ["9세이하", "70대"], "전체"),
+    # 이동평균 창보다 긴 기간, 연령대 일부만
+    ("2023-01-01", "2024-12-31", AGE_LABELS[3:], "여"),
+]
+
+
+@pytest.fixture(scope="session")
+def visit_frames():
+    """(기존 페이지가 쓰던 전처리 프레임, 스키마를 입힌 대시보드 진료 기록)."""
+    df = preprocess_visits(visit_sheet(20_000, seed=7, end=VISIT_END))
+    visits, _ = apply_schema(df)
+    return df, visits
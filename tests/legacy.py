@@ -0,0 +1,146 @@
+"""기존(베이스라인) 구현: 테스트와 벤치마크의 비교 기준."""
+import pandas as pd
+
+from core.preprocess import special_cities
+
+
+# pages/지역장악도.py 에 있던 행별 주소 분리 함수
+def split_address(addr: str):
+    parts = addr.split()
+    # 세종특별자치시 처리: ['세종특별자치시', '어진동']
+    if parts[0] == "세종특별자치시" and len(parts) == 2:
+        return pd.Series({
+            "시/도": parts[0],
+            "시/군/구": "",
+            "행정동": parts[1]
+        })
+    # 네 칸짜리: ['경기도', '수원시', '영통구', '망포동']
+    elif len(parts) == 4 and parts[1] in special_cities:
+        return pd.Series({
+            "시/도": parts[0],
+            "시/군/구": f"{parts[1]} {parts[2]}",
+            "행정동": parts[3]
+        })
+    # 기본 세 칸짜리: ['서울특별시', '강남구', '역삼동']
+    elif len(parts) == 3 and parts[1] not in special_cities:
+        return pd.Series({
+            "시/도": parts[0],
+            "시/군/구": parts[1],
+            "행정동": parts[2]
+        })
+    # 그 외는 무시
+    else:
+        return pd.Series({
+            "시/도": None,
+            "시/군/구": None,
+            "행정동": None
+        })
+
+
+SAMPLES = [
+    "서울특별시 강남구 역삼1동",
+    "경기도 시흥시 월곶동",
+    "경기도 수원시 영통구 망포동",
+    "세종특별자치시 어진동",
+    "세종특별자치시 세종시 조치원읍",
+    # 규칙에 안 맞는 행: 시/도·시/군구 합계 행, 특례시인데 세 칸, 다섯 칸
+    "경기도",
+    "경기도 수원시",
+    "경기도 수원시 망포동",
+    "경기도 시흥시 월곶동 1 2",
+    "서울특별시  종로구   사직동",
+]
+
+
+def sample(n: int) -> pd.Series:
+    # 실제 인구현황 시트 규모(약 3,500개 행정동)
+    return pd.Series((SAMPLES * (n // len(SAMPLES) + 1))[:n])
+
+
+# --- 환자정보.py 의 필터·집계 (사이드바 필터 → KPI, 일별 추이, 전년 동기, 월별 성장률, 히트맵) ---
+
+def categorize_time(hms):
+    if pd.isna(hms):
+        time_str = '000000'
+    else:
+        try:
+            val = int(hms)
+            time_str = str(val).zfill(6)
+        except:
+            time_str = str(hms).zfill(6)
+    hour = int(time_str[:2])
+    return f"{hour:02d}"
+
+
+def filter_visits(df, start_date, end_date, age_band, gender):
+    filtered = df[
+        (df['진료일자'] >= pd.to_datetime(start_date)) &
+        (df['진료일자'] <= pd.to_datetime(end_date)) &
+        (df['연령대'].isin(age_band))
+    ]
+    if gender != "전체":
+        filtered = filtered[filtered['성별'] == gender]
+    return filtered
+
+
+def kpis(filtered) -> dict:
+    return {
+        'patients': len(filtered.drop_duplicates("환자번호")),
+        'counts': len(filtered),
+        'new': len(filtered[filtered['초/재진'] == "신환"]),
+        'return': len(filtered[filtered['초/재진'] != "신환"]),
+        'avg_age': filtered['나이'].mean(),
+    }
+
+
+def moving_averages(filtered) -> pd.DataFrame:
+    daily = (
+        filtered
+        .groupby('진료일자')
+        .size()
+        .reset_index(name='환자수')
+        .sort_values('진료일자')
+    )
+    for w in (6, 30, 60, 90):
+        daily[f'MA{w}'] = daily['환자수'].rolling(window=w, min_periods=1).mean()
+    return daily
+
+
+def year_over_year(df, start_date, end_date) -> pd.DataFrame:
+    daily2 = df.groupby('진료일자').size().reset_index(name='환자수').sort_values('진료일자')
+    start, end = pd.to_datetime(start_date), pd.to_datetime(end_date)
+    ly_start, ly_end = start - pd.DateOffset(years=1), end - pd.DateOffset(years=1)
+    curr = daily2[(daily2['진료일자'] >= start) & (daily2['진료일자'] <= end)].copy()
+    ly = daily2[(daily2['진료일자'] >= ly_start) & (daily2['진료일자'] <= ly_end)].copy()
+    curr['year_group'] = '조회 기간'
+    ly['year_group'] = '전년 동기'
+    curr['plot_date'] = curr['진료일자']
+    ly['plot_date'] = ly['진료일자'] + pd.DateOffset(years=1)
+    return pd.concat([curr[['plot_date', '환자수', 'year_group', '진료일자']],
+                      ly[['plot_date', '환자수', 'year_group', '진료일자']]])
+
+
+def monthly_growth(filtered, df, start_date, end_date) -> pd.DataFrame:
+    # 기존은 월 끝(freq='M') 기준이라 2월 말을 1년 옮기면 윤년에 어긋났다: 월 초('MS')로 비교
+    curr_monthly = filtered.groupby(pd.Grouper(key='진료일자', freq='MS')).size().reset_index(name='환자수')
+    ly_filtered = df[
+        (df['진료일자'] >= (pd.to_datetime(start_date) - pd.DateOffset(years=1))) &
+        (df['진료일자'] <= (pd.to_datetime(end_date) - pd.DateOffset(years=1)))
+    ]
+    ly_monthly = ly_filtered.groupby(pd.Grouper(key='진료일자', freq='MS')).size().reset_index(name='환자수')
+    ly_monthly['진료일자'] = ly_monthly['진료일자'] + pd.DateOffset(years=1)
+    monthly = curr_monthly.merge(ly_monthly.rename(columns={'환자수': 'ly_환자수'}), on='진료일자', how='left')
+    monthly['growth_rate'] = (monthly['환자수'] - monthly['ly_환자수']) / monthly['ly_환자수']
+    monthly['ly_환자수'] = monthly['ly_환자수'].fillna(0).astype(int)
+    monthly['count_label'] = (
+        monthly['ly_환자수'].map(lambda x: f"{x:,}명") + "\\n-> " +
+        monthly['환자수'].map(lambda x: f"{x:,}명")
+    )
+    return monthly
+
+
+def weekday_hour_counts(filtered) -> pd.DataFrame:
+    filtered = filtered.copy()
+    filtered['진료시간대'] = filtered['진료시간'].apply(categorize_time)
+    filtered['요일'] = filtered['진료일자'].dt.day_name()
+    return filtered.groupby(['요일', '진료시간대']).size().reset_index(name='count')
@@ -0,0 +1,99 @@
+"""DuckDB SQL 엔진(query_backend=duckdb)이 기존 pandas 계산과 같은 값인지."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import population_sheet
+from core.filters import visit_rows
+from core.geo import patient_points
+from core.patients import PatientTable
+from core.penetration import MAX_MONTHS, ActivityTable, population_long
+from core.preprocess import preprocess_population
+from core.regions import RegionIndex
+from tests import legacy
+from tests.conftest import FILTERS, VISIT_END
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def tables(visit_frames):
+    _, visits = visit_frames
+    pop = preprocess_population(population_sheet(seed=7))
+    regions = RegionIndex(pop, extra=visits)
+    pop = pop.assign(지역코드=regions.encode(pop))
+    return visits, PatientTable(visits, regions), population_long(pop), len(regions.keys)
+
+
+@pytest.fixture(scope="module")
+def engine(tables, tmp_path_factory):
+    from core.engine import SqlEngine
+
+    visits, patients, pop_long, _ = tables
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DASHBOARD_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        engine = SqlEngine(1, visits, patients.frame, pop_long)
+        yield engine
+        engine.close()
+
+
+def _reset(frame):
+    return frame.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_kpis(visit_frames, engine, start, end, ages, gender):
+    df, _ = visit_frames
+    expected = legacy.kpis(legacy.filter_visits(df, start, end, ages, gender))
+    assert engine.kpis(start, end, ages, gender) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_moving_averages(visit_frames, engine, start, end, ages, gender):
+    df, _ = visit_frames
+    expected = legacy.moving_averages(legacy.filter_visits(df, start, end, ages, gender))
+    got = engine.series(ages, gender).moving_averages(start, end)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end", sorted({f[:2] for f in FILTERS}))
+def test_year_over_year(visit_frames, engine, start, end):
+    df, _ = visit_frames
+    expected = legacy.year_over_year(df, start, end)
+    got = engine.series().year_over_year(start, end)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_monthly_growth(visit_frames, engine, start, end, ages, gender):
+    df, _ = visit_frames
+    expected = legacy.monthly_growth(legacy.filter_visits(df, start, end, ages, gender), df, start, end)
+    got = engine.monthly_growth(start, end, ages, gender)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_weekday_hour_counts(visit_frames, engine, start, end, ages, gender):
+    df, _ = visit_frames
+    expected = legacy.weekday_hour_counts(legacy.filter_visits(df, start, end, ages, gender))
+    got = engine.weekday_hour_counts(start, end, ages, gender).sort_values(['요일', '진료시간대'])
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_points(engine, tables, start, end, ages, gender):
+    # 기존 지도는 진료마다 점을 찍었다: 환자별 마지막 좌표는 pandas 경로(geo.patient_points)와 비교
+    visits, _, _, _ = tables
+    expected = patient_points(visits, visit_rows(visits, start, end, ages, gender))
+    got = engine.points(start, end, ages, gender)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("months", [1, 3, 12, MAX_MONTHS])
+def test_penetration(engine, tables, months):
+    _, patients, pop_long, n_regions = tables
+    expected = ActivityTable(patients.frame, VISIT_END, n_regions).penetration(pop_long, months)
+    got = engine.penetration(VISIT_END, months)
+    assert got['환자수'].sum() > 0
+    np.testing.assert_array_equal(got['환자수'].to_numpy(), expected['환자수'].to_numpy())
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_categorical=False)
@@ -0,0 +1,75 @@
+"""사전 집계 구조(큐브, 시계열 엔진, 고유 환자 인덱스)가 기존 pandas 계산과 같은 값인지."""
+import pandas as pd
+import pytest
+
+from core.cube import build_visit_cube, kpis, monthly_growth, slice_cube, weekday_hour_counts
+from core.distinct import DistinctPatientIndex
+from core.timeseries import TimeSeriesEngine
+from tests import legacy
+from tests.conftest import FILTERS
+
+@pytest.fixture(scope="module")
+def structures(visit_frames):
+    _, visits = visit_frames
+    cube = build_visit_cube(visits)
+    return cube, TimeSeriesEngine(cube), DistinctPatientIndex(visits)
+
+
+def _reset(frame):
+    return frame.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_kpis(visit_frames, structures, start, end, ages, gender):
+    df, _ = visit_frames
+    cube, _, patient_index = structures
+    expected = legacy.kpis(legacy.filter_visits(df, start, end, ages, gender))
+    got = kpis(slice_cube(cube, start, end, ages, gender))
+    got['patients'] = patient_index.count(start, end, ages, gender)
+    assert got == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_moving_averages(visit_frames, structures, start, end, ages, gender):
+    df, _ = visit_frames
+    _, timeseries, _ = structures
+    expected = legacy.moving_averages(legacy.filter_visits(df, start, end, ages, gender))
+    got = timeseries.series(ages, gender).moving_averages(start, end)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end", sorted({f[:2] for f in FILTERS}))
+def test_year_over_year(visit_frames, structures, start, end):
+    df, _ = visit_frames
+    _, timeseries, _ = structures
+    expected = legacy.year_over_year(df, start, end)
+    got = timeseries.series().year_over_year(start, end)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_monthly_growth(visit_frames, structures, start, end, ages, gender):
+    df, _ = visit_frames
+    cube, _, _ = structures
+    expected = legacy.monthly_growth(legacy.filter_visits(df, start, end, ages, gender), df, start, end)
+    got = monthly_growth(slice_cube(cube, start, end, ages, gender), cube, start, end)
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_weekday_hour_counts(visit_frames, structures, start, end, ages, gender):
+    df, _ = visit_frames
+    cube, _, _ = structures
+    expected = legacy.weekday_hour_counts(legacy.filter_visits(df, start, end, ages, gender))
+    got = weekday_hour_counts(slice_cube(cube, start, end, ages, gender))
+    got = got.astype({'요일': str, '진료시간대': str}).sort_values(['요일', '진료시간대'])
+    pd.testing.assert_frame_equal(_reset(got), _reset(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end, ages, gender", FILTERS)
+def test_distinct_patients_approximate(visit_frames, structures, start, end, ages, gender):
+    df, _ = visit_frames
+    _, _, patient_index = structures
+    expected = legacy.kpis(legacy.filter_visits(df, start, end, ages, gender))['patients']
+    # HyperLogLog 표준오차 약 3.3%: 4 시그마 안
+    assert patient_index.count(start, end, ages, gender, approximate=True) == pytest.approx(expected, rel=0.14, abs=3)
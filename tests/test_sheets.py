@@ -0,0 +1,151 @@
+"""구간별 시트 받기(fetch_columns)와 증분 스냅샷 동기화를 가짜 워크시트로."""
+import pandas as pd
+import pytest
+from gspread.exceptions import APIError
+
+from benchmarks.fakes import FakeWorksheet, _Response
+from core.sheets import call_with_retry, fetch_columns
+from core.snapshot import records_frame, sync_snapshot
+
+HEADER = ["환자번호", "주소", "나이"]
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch, tmp_path):
+    monkeypatch.setenv("DASHBOARD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("DASHBOARD_FETCH_BACKOFF_SECONDS", "0")
+    monkeypatch.setenv("DASHBOARD_FETCH_CHUNK_ROWS", "4")
+
+
+def _rows(n, start=1):
+    return [[str(i), f"서울특별시 종로구 {i}", str(20 + i % 50)] for i in range(start, start + n)]
+
+
+def _columns(rows, width=len(HEADER)):
+    return [[r[j] if j < len(r) else "" for r in rows] for j in range(width)]
+
+
+def _full_load(values):
+    # 매번 시트 전체를 받았을 때의 프레임
+    return records_frame(values[0], _columns(values[1:], len(values[0])))
+
+
+def _assert_same(frame, values):
+    expected = _full_load(values)
+    # 문자열 컬럼은 object/str 표현 차이만 허용
+    kinds = [{"T": "O"}.get(dtype.kind, dtype.kind) for dtype in frame.dtypes]
+    assert kinds == [{"T": "O"}.get(dtype.kind, dtype.kind) for dtype in expected.dtypes]
+    pd.testing.assert_frame_equal(frame.astype(object), expected.astype(object))
+
+
+def test_blank_rows_between_chunks_keep_their_place():
+    rows = _rows(3) + [[], [], [], [], []] + _rows(3, start=4) + [["", "", ""]] + _rows(2, start=7)
+    ws = FakeWorksheet([HEADER] + rows)
+    assert fetch_columns(ws, len(HEADER)) == _columns(rows)
+
+
+def test_trailing_blank_rows_are_dropped():
+    rows = _rows(5)
+    ws = FakeWorksheet([HEADER] + rows + [[], ["", ""], []], extra_rows=7)
+    assert fetch_columns(ws, len(HEADER)) == _columns(rows)
+
+
+def test_short_rows_are_padded():
+    rows = [["1"], ["2", "주소"], ["3", "", "40"]]
+    assert fetch_columns(FakeWorksheet([HEADER] + rows), len(HEADER)) == _columns(rows)
+
+
+def test_retries_rate_limited_chunks(monkeypatch):
+    monkeypatch.setenv("DASHBOARD_FETCH_RETRIES", "20")
+    rows = _rows(40)
+    ws = FakeWorksheet([HEADER] + rows, fail_rate=0.3, extra_rows=0, seed=1)
+    assert fetch_columns(ws, len(HEADER)) == _columns(rows)
+    # 10 구간 + 실패한 요청 재시도
+    assert ws.calls > 10
+
+
+def test_call_with_retry_gives_up_on_other_errors():
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise APIError(_Response(400, "Bad request"))
+
+    with pytest.raises(APIError):
+        call_with_retry(bad_request)
+    assert len(calls) == 1
+
+
+def test_call_with_retry_raises_after_last_attempt():
+    calls = []
+
+    def quota():
+        calls.append(1)
+        raise APIError(_Response(429, "Quota exceeded"))
+
+    with pytest.raises(APIError):
+        call_with_retry(quota, retries=2)
+    assert len(calls) == 3
+
+
+def test_sync_unchanged_returns_none():
+    ws = FakeWorksheet([HEADER] + _rows(10))
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+    assert sync_snapshot(ws, "visits") is None
+
+
+def test_sync_appends_only_new_rows():
+    values = [HEADER] + _rows(30)
+    ws = FakeWorksheet(values, extra_rows=0)
+    sync_snapshot(ws, "visits")
+    ws.values = values + _rows(5, start=31)
+    ws.calls = 0
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+    # 헤더 + 기존 마지막 행(31행)부터 끝(36행)까지 4행씩 두 구간; 전체를 받으면 1 + 9
+    assert ws.calls == 3
+
+
+def test_sync_reloads_when_last_row_is_edited():
+    values = [HEADER] + _rows(30)
+    ws = FakeWorksheet(values)
+    sync_snapshot(ws, "visits")
+    ws.values = values[:-1] + [["30", "부산광역시 중구 30", "77"]] + _rows(2, start=31)
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+
+
+def test_sync_reloads_when_rows_are_deleted():
+    values = [HEADER] + _rows(30)
+    ws = FakeWorksheet(values)
+    sync_snapshot(ws, "visits")
+    ws.values = values[:10]
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+
+
+def test_sync_reloads_when_header_changes():
+    values = [HEADER] + _rows(10)
+    ws = FakeWorksheet(values)
+    sync_snapshot(ws, "visits")
+    ws.values = [HEADER + ["성별"]] + [r + ["남"] for r in _rows(11)]
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+
+
+@pytest.mark.parametrize("appended", [
+    [["A-31", "서울특별시 중구 31", "40"]],    # 숫자 ID 뒤에 문자 ID
+    [["31", "서울특별시 중구 31", "40.5"]],    # 정수 → 실수
+    [["31", "서울특별시 중구 31", ""]],        # 정수 → 빈 칸
+    [["31", "", "40"]],                         # 문자열 컬럼에 빈 칸
+])
+def test_sync_append_matches_full_load_when_dtype_changes(appended):
+    values = [HEADER] + _rows(30)
+    ws = FakeWorksheet(values)
+    sync_snapshot(ws, "visits")
+    ws.values = values + appended
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
+
+
+def test_sync_append_to_all_blank_column():
+    values = [HEADER] + [r[:2] + [""] for r in _rows(10)]
+    ws = FakeWorksheet(values)
+    sync_snapshot(ws, "visits")
+    ws.values = values + [["11", "서울특별시 중구 11", "33"]]
+    _assert_same(sync_snapshot(ws, "visits"), ws.values)
@@ -0,0 +1,27 @@
+"""split_addresses(벡터화)가 기존 행별 split_address 와 같은 결과인지."""
+import pandas as pd
+import pytest
+
+from core.preprocess import split_addresses
+from tests.legacy import SAMPLES, sample, split_address
+
+
+def _assert_same(addr: pd.Series):
+    old = addr.apply(split_address).astype(object)
+    new = split_addresses(addr).astype(object)
+    # 빈 값은 None/NaN 표현 차이를 무시
+    pd.testing.assert_frame_equal(old.where(old.notna(), None), new.where(new.notna(), None), check_names=False)
+
+
+@pytest.mark.parametrize("address", SAMPLES)
+def test_matches_legacy_per_address(address):
+    _assert_same(pd.Series([address]))
+
+
+def test_matches_legacy_on_sheet_sized_sample():
+    _assert_same(sample(3500))
+
+
+def test_keeps_index():
+    addr = pd.Series(SAMPLES, index=range(100, 100 + len(SAMPLES)))
+    assert split_addresses(addr).index.equals(addr.index)
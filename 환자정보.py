@@ -1,11 +1,18 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 import folium
-import gspread
 from streamlit_folium import folium_static
 from folium.plugins import FastMarkerCluster
 
+from core.charts import growth_chart, trend_chart, yoy_chart
+from core.cube import kpis, monthly_growth, slice_cube, weekday_hour_counts
+from core.config import setting
+from core.data import current_dataset, data_status
+from core.filters import visit_rows
+from core.instrument import begin_run, perf_panel, section_run, stage
+from core.memo import result_cache
+from core.geo import grid_cells, patient_points
+
 def authenticate():
     # 세션 스테이트에 인증 플래그 초기화
     if "authenticated" not in st.session_state:
@@ -36,374 +43,210 @@ def authenticate():
 st.set_page_config(page_title="환자 대시보드", layout="wide")
 
 authenticate()
-
-# 1) 데이터 로드 (Google Sheets via API)
-@st.cache_data
-def load_data():
-    creds_dict = st.secrets["gcp_service_account"]
-    client = gspread.service_account_from_dict(creds_dict)
-    sheet_id = st.secrets["google_sheets"]["sheet_id"]
-    worksheet_name = st.secrets["google_sheets"]["worksheet_name"]
-    sheet = client.open_by_key(sheet_id).worksheet(worksheet_name)
-    records = sheet.get_all_records()
-    return pd.DataFrame(records)
-
-df = load_data()
-
-# 2) 전처리
-df['진료일자'] = pd.to_datetime(df['진료일자'], format='%Y%m%d')
-
-def categorize_time(hms):
-    if pd.isna(hms):
-        time_str = '000000'
-    else:
-        try:
-            val = int(hms)
-            time_str = str(val).zfill(6)
-        except:
-            time_str = str(hms).zfill(6)
-    hour = int(time_str[:2])
-    return f"{hour:02d}"
-
-bins = list(range(0, 101, 10)) + [999]
-labels = ["9세이하"] + [f"{i}대" for i in range(10, 100, 10)] + ["100세이상"]
-df['연령대'] = pd.cut(
-    df['나이'],
-    bins=bins,
-    labels=labels,
-    right=False,
-    include_lowest=True
-)
+# 구간별 시간/행 수/메모리 계측 (관리자 패널)
+begin_run("환자정보")
+
+# 1) 데이터 로드 (공유 데이터셋: 백그라운드 갱신, 제자리 수정 금지)
+with stage("1) 데이터 로드") as s:
+    data = current_dataset()
+    # 진료 기록 프레임과 pandas 질의 구조 (query_backend=duckdb 이면 None)
+    df = data.visits
+    cube = data.cube
+    patient_index = data.patient_index
+    # 환자 차원 테이블 (환자별 한 줄): 조건 없는 환자수·지도 좌표는 여기서 바로
+    patients = data.patients
+    # query_backend=duckdb 이면 필터 질의는 Parquet 위 SQL 로 (없으면 None: 큐브/인덱스 경로)
+    engine = data.engine
+    timeseries = engine if engine is not None else data.timeseries
+    s.rows_out = data.visit_rows
+
+# 2) 전처리: 진료일자/연령대/진료시간대 컬럼은 공유 로더에서 한 번만 계산
 
 # 3) 사이드바 필터
-st.sidebar.header("필터 설정")
-start_date = st.sidebar.date_input("시작 진료일자", df['진료일자'].min())
-end_date = st.sidebar.date_input("종료 진료일자", df['진료일자'].max())
-age_band = st.sidebar.multiselect(
-    "연령대",
-    options=df['연령대'].cat.categories.tolist(),
-    default=df['연령대'].cat.categories.tolist()
-)
-gender = st.sidebar.selectbox(
-    "성별",
-    options=["전체"] + df['성별'].dropna().unique().tolist()
-)
-
-filtered = df[
-    (df['진료일자'] >= pd.to_datetime(start_date)) &
-    (df['진료일자'] <= pd.to_datetime(end_date)) &
-    (df['연령대'].isin(age_band))
-]
-if gender != "전체":
-    filtered = filtered[filtered['성별'] == gender]
-
-filtered['진료시간대'] = df['진료시간'].apply(categorize_time)
+with stage("3) 사이드바 필터"):
+    st.sidebar.header("필터 설정")
+    data_status(data)
+    mem_before, mem_after = data.memory
+    if engine is None:
+        st.sidebar.caption(
+            f"데이터 {data.visit_rows:,}행 · 메모리 {mem_after / 2**20:.1f}MB "
+            f"(타입 변환 전 {mem_before / 2**20:.1f}MB)"
+        )
+    else:
+        st.sidebar.caption(f"데이터 {data.visit_rows:,}행 · DuckDB (Parquet) 질의")
+    start_date = st.sidebar.date_input("시작 진료일자", data.first_day)
+    end_date = st.sidebar.date_input("종료 진료일자", data.last_day)
+    age_band = st.sidebar.multiselect(
+        "연령대",
+        options=data.age_bands,
+        default=data.age_bands
+    )
+    gender = st.sidebar.selectbox(
+        "성별",
+        options=["전체"] + data.genders
+    )
+
+    # 결과 캐시: (구간, 데이터 버전, 필터 조건)별 KPI·집계 프레임·지도 좌표를 세션끼리 공유
+    # (꺼낸 값은 다른 세션도 보므로 수정 금지)
+    memo = result_cache()
+    filters = (data.version, start_date, end_date, tuple(age_band), gender)
+    # 필터가 모든 진료를 고르는 경우 (기본 화면)
+    unfiltered = patients.covers(start_date, end_date, age_band, gender)
+
+    def part():
+        # 같은 조건의 사전 집계 큐브 (건수 기반 KPI·차트는 모두 여기서, 캐시에 없을 때만 자름)
+        return memo.get(('part',) + filters, lambda: slice_cube(cube, start_date, end_date, age_band, gender))
 
 # 4) KPI 카드
-patients_in_period = len(filtered.drop_duplicates("환자번호"))
-counts_in_period = len(filtered)
-new_count = len(filtered[filtered['초/재진'] == "신환"])
-return_count = len(filtered[filtered['초/재진'] != "신환"])
-new_ratio = new_count / counts_in_period if counts_in_period else 0
-return_ratio = return_count / counts_in_period if counts_in_period else 0
-avg_age = filtered['나이'].mean()
-
-col1, col2, col3, col4, col5 = st.columns(5)
-col1.metric("환자수", f"{patients_in_period:,}명")
-col2.metric("진료 횟수", f"{counts_in_period:,}번")
-col3.metric("신환 비율", f"{new_ratio:.1%}")
-col4.metric("재방문 비율", f"{return_ratio:.1%}")
-col5.metric("평균 연령", f"{avg_age:.1f}세")
-
-# 5) 일별 내원 추이 (토글 가능한 추세선)
-st.subheader("일별 내원 추이")
-
-# 일별 집계
-daily = (
-    filtered
-    .groupby('진료일자')
-    .size()
-    .reset_index(name='환자수')
-    .sort_values('진료일자')
-)
-
-# 이동평균 컬럼 추가
-daily['MA6']  = daily['환자수'].rolling(window=6,  min_periods=1).mean()
-daily['MA30'] = daily['환자수'].rolling(window=30, min_periods=1).mean()
-daily['MA60'] = daily['환자수'].rolling(window=60, min_periods=1).mean()
-daily['MA90'] = daily['환자수'].rolling(window=90, min_periods=1).mean()
-
-# long form 변환
-melted = daily.melt(
-    id_vars='진료일자',
-    value_vars=['환자수','MA6','MA30','MA60','MA90'],
-    var_name='지표',
-    value_name='값'
-)
-# 범례 클릭으로 토글할 셀렉션
-legend_sel = alt.selection_multi(fields=['지표'], bind='legend')
-
-# 차트
-trend_chart = (
-    alt.Chart(melted)
-       .mark_line()
-       .encode(
-           x=alt.X('진료일자:T', title='진료일자'),
-           y=alt.Y('값:Q',     title='진료횟수'),
-           color=alt.Color(
-               '지표:N',
-               scale=alt.Scale(
-                   domain=['환자수','MA6','MA30','MA60','MA90'],
-                   range=['#FFDC3C','#4BA3C7','#00C49A','#FF8C42','#9B59B6']
-               )
-           ),
-           opacity=alt.condition(legend_sel, alt.value(1), alt.value(0.1)),
-           tooltip=[
-               alt.Tooltip('진료일자:T', title='날짜'),
-               alt.Tooltip('지표:N',      title='지표'),
-               alt.Tooltip('값:Q',        title='내원수')
-           ]
-       )
-       .add_params(legend_sel)
-        .interactive()
-       .properties(height=400)
-)
-
-daily_hover = (
-    alt.Chart(melted)
-       .mark_point(size=200, opacity=0)
-       .transform_filter(alt.datum.지표=='환자수')
-       .encode(
-            x='진료일자:T', y='값:Q',
-            tooltip=[
-                alt.Tooltip('진료일자:T', title='날짜'),
-                alt.Tooltip('값:Q',        title='내원수')
-            ]
+with stage("4) KPI 카드"):
+    # 조회 기간이 설정값(approx_distinct_days)보다 길면 HyperLogLog 근사치
+    approx_days = setting("approx_distinct_days")
+    # (조건이 없거나 SQL 엔진이 정확한 값을 세면 근사하지 않음)
+    approximate = (not unfiltered and engine is None and approx_days is not None
+                   and (end_date - start_date).days > int(approx_days))
+
+    def compute_kpis():
+        if engine is not None:
+            return engine.kpis(start_date, end_date, age_band, gender)
+        stats = kpis(part())
+        stats['patients'] = len(patients) if unfiltered else patient_index.count(
+            start_date, end_date, age_band, gender, approximate=approximate
         )
-)
+        return stats
+
+    stats = memo.get(('kpi',) + filters + (approximate,), compute_kpis)
+    patients_in_period = stats['patients']
+    counts_in_period = stats['counts']
+    new_count = stats['new']
+    return_count = stats['return']
+    new_ratio = new_count / counts_in_period if counts_in_period else 0
+    return_ratio = return_count / counts_in_period if counts_in_period else 0
+    avg_age = stats['avg_age']
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("환자수", f"{'약 ' if approximate else ''}{patients_in_period:,}명")
+    col2.metric("진료 횟수", f"{counts_in_period:,}번")
+    col3.metric("신환 비율", f"{new_ratio:.1%}")
+    col4.metric("재방문 비율", f"{return_ratio:.1%}")
+    col5.metric("평균 연령", f"{avg_age:.1f}세")
 
-trend_hover = (
-    alt.Chart(melted)
-       .mark_point(size=200, opacity=0)
-       .transform_filter(alt.datum.지표!='환자수')
-       .encode(
-            x='진료일자:T', y='값:Q',
-            tooltip=[
-                alt.Tooltip('진료일자:T', title='날짜'),
-                alt.Tooltip('지표:N',      title='지표'),
-                alt.Tooltip('값:Q',        title='내원수')
-            ]
+# 5) 일별 내원 추이 (토글 가능한 추세선)
+with stage("5) 일별 내원 추이") as s:
+    st.subheader("일별 내원 추이")
+
+    # 일별 집계 + 이동평균 (MA6/30/60/90, 창은 내원일 기준):
+    # 필터 조합별 누적합 배열에서 기간만 잘라 읽음
+    daily = memo.get(
+        ('trend',) + filters,
+        lambda: timeseries.series(age_band, gender).moving_averages(start_date, end_date)
+    )
+    s.rows_out = len(daily)
+
+    # 넓은 프레임 그대로: 레이어 공유 데이터 + 브라우저 fold, 점이 많으면 LTTB 로 줄임
+    final_chart = trend_chart(daily)
+    st.altair_chart(final_chart, use_container_width=True)
+
+# 6) ~ 8) 무거운 구간은 fragment: 구간 안의 위젯(보기 토글, 지도 옵션)을 바꾸면 그 구간만
+# 다시 실행되고, 보기를 끈 구간은 계산하지 않는다. 사이드바 필터가 바뀌면 전체가 다시 실행된다.
+@st.fragment
+def yoy_section():
+    with section_run("환자정보: 전년 동기"), stage("6) 전년 동기 비교"):
+        st.subheader("전년 동기 내원 추이 비교")
+        if not st.toggle("보기", value=True, key="show_yoy"):
+            return
+        # 조회 기간 + 전년 동기 일별 집계 (연령대/성별 필터 없이 기간만, 전년은 1년 뒤로 옮겨 비교)
+        comp = memo.get(('yoy',) + filters, lambda: timeseries.series().year_over_year(start_date, end_date))
+        st.altair_chart(yoy_chart(comp), use_container_width=True)
+
+@st.fragment
+def growth_section():
+    with section_run("환자정보: 월간 성장률"), stage("6) 월간 성장률"):
+        st.subheader("월간 성장률")
+        if not st.toggle("보기", value=True, key="show_growth"):
+            return
+        # 선택 기간 월별 집계와 전년 동기(연령대/성별 필터 없이 기간만) 대비 성장률
+        monthly = memo.get(
+            ('monthly',) + filters,
+            lambda: engine.monthly_growth(start_date, end_date, age_band, gender) if engine is not None
+            else monthly_growth(part(), cube, start_date, end_date)
         )
-)
-
-final_chart = (
-    alt.layer(trend_chart, daily_hover, trend_hover)
-       .resolve_scale(y='shared')
-       .properties(
-           width='container',
-           autosize={'type':'fit-x','contains':'padding'}
-       )
-)
-st.altair_chart(final_chart, use_container_width=True)
-
-# 일별 집계
-daily2 = (
-    df
-    .groupby('진료일자')
-    .size()
-    .reset_index(name='환자수')
-    .sort_values('진료일자')
-)
-
-# 기준 기간 정의
-start = pd.to_datetime(start_date)
-end   = pd.to_datetime(end_date)
-
-# 전년 동기 기간
-ly_start = start - pd.DateOffset(years=1)
-ly_end   = end   - pd.DateOffset(years=1)
-
-# 기간별 필터링
-curr = daily2[(daily2['진료일자'] >= start) & (daily2['진료일자'] <= end)].copy()
-ly   = daily2[(daily2['진료일자'] >= ly_start) & (daily2['진료일자'] <= ly_end)].copy()
-
-# 전년 데이터를 '금년 날짜'로 옮겨오기
-ly['pseudo_date'] = ly['진료일자'] + pd.DateOffset(years=1)
-
-# 비교용 컬럼 추가
-curr['year_group'] = '조회 기간'
-ly  ['year_group'] = '전년 동기'
-
-# 날짜 컬럼 통일
-curr['plot_date'] = curr['진료일자']
-ly  ['plot_date'] = ly['pseudo_date']
-
-# 합치기
-comp = pd.concat([curr[['plot_date','환자수','year_group', '진료일자']],
-                  ly  [['plot_date','환자수','year_group', '진료일자']]])
-
-comp_area = (
-    alt.Chart(comp)
-      .mark_area(interpolate='monotone', opacity=0.4)
-      .encode(
-          x=alt.X('plot_date:T', title='진료일자'),
-          y=alt.Y('환자수:Q', title='진료횟수', stack=None),
-          color=alt.Color('year_group:N', title='기간',
-                          scale=alt.Scale(domain=['조회 기간','전년 동기'],
-                                          range=['#FFDC3C','#A0AEC0'])),
-          tooltip=[
-            alt.Tooltip('진료일자:T', title='날짜'),
-            alt.Tooltip('환자수:Q',   title='내원수'),
-            alt.Tooltip('year_group:N', title='기간')
-          ]
-      )
-      .properties(height=400)
-      .interactive()
-)
-
-# 필요하다면 투명 포인트로 hover 레이어 추가
-comp_hover = (
-    alt.Chart(comp)
-      .mark_point(size=200, opacity=0)
-      .encode(
-          x='plot_date:T', y='환자수:Q',
-          tooltip=[
-            alt.Tooltip('진료일자:T', title='날짜'),
-            alt.Tooltip('환자수:Q', title='내원수'),
-            alt.Tooltip('year_group:N', title='기간')
-          ]
-      )
-)
-
-final_comp_chart = comp_area + comp_hover
-
-# st.subheader("전년 동기 내원 추이 비교")
-# #st.altair_chart(final_comp_chart, use_container_width=True)
-
-# 1) 선택 기간 월별 집계
-curr_monthly = (
-    filtered
-    .groupby(pd.Grouper(key='진료일자', freq='M'))
-    .size()
-    .reset_index(name='환자수')
-)
-# 2) 전년 동기 월별 집계
-ly_filtered = df[
-    (df['진료일자'] >= (pd.to_datetime(start_date) - pd.DateOffset(years=1))) &
-    (df['진료일자'] <= (pd.to_datetime(end_date)   - pd.DateOffset(years=1)))
-]
-ly_monthly = (
-    ly_filtered
-    .groupby(pd.Grouper(key='진료일자', freq='M'))
-    .size()
-    .reset_index(name='환자수')
-)
-# 3) 날짜를 비교하기 쉽게 연동
-ly_monthly['진료일자'] = ly_monthly['진료일자'] + pd.DateOffset(years=1)
-# 4) growth_rate 계산
-monthly = curr_monthly.merge(
-    ly_monthly.rename(columns={'환자수':'ly_환자수'}),
-    on='진료일자', how='left'
-)
-monthly['growth_rate'] = (monthly['환자수'] - monthly['ly_환자수']) / monthly['ly_환자수']
-
-# NaN을 0으로 채우고 int로 변환
-monthly['ly_환자수'] = monthly['ly_환자수'].fillna(0).astype(int)
-
-monthly['count_label'] = (
-    monthly['ly_환자수'].map(lambda x: f"{x:,}명") + "\\n-> " +
-    monthly['환자수'].map(lambda x: f"{x:,}명")
-)
-
-# 5) 월간 성장률 차트
-# 1) 막대 차트
-month_bar = (
-    alt.Chart(monthly)
-      .transform_filter(alt.datum.growth_rate != None)
-      .mark_bar()
-      .encode(
-          x=alt.X('yearmonth(진료일자):O', title='월'),
-          y=alt.Y('growth_rate:Q', axis=alt.Axis(format='.1%')),
-          tooltip=[
-             alt.Tooltip('yearmonth(진료일자):T', title='월'),
-             alt.Tooltip('growth_rate:Q',       title='성장률', format='.1%'),
-             alt.Tooltip('환자수:Q',             title='이번 년 환자수'),
-             alt.Tooltip('ly_환자수:Q',          title='전년 동기 환자수')
-          ]
-      )
-      .properties(height=300, width={'step':60})
-)
-
-# 2) growth_rate 레이블 (막대 위쪽)
-label_rate = (
-    alt.Chart(monthly)
-      .transform_filter(alt.datum.growth_rate != None)
-      .mark_text(
-          dy=-50,              # 막대 꼭대기 위로 약간 띄움
-          align='center',
-          baseline='bottom',
-          fontWeight='bold',
-          fontSize=16
-      )
-      .encode(
-          x='yearmonth(진료일자):O',
-          y='growth_rate:Q',
-          text=alt.Text('growth_rate:Q', format='.1%')
-      )
-)
-
-# 3) 환자수/전년환자수 레이블 (막대 바로 위나 아래)
-label_count = (
-    alt.Chart(monthly)
-      .transform_filter(alt.datum.growth_rate != None)
-      .mark_text(
-          dy=-40,               # growth_rate 레이블 바로 아래
-          align='center',
-          baseline='top',
-          fontWeight='bold',
-          lineBreak='\\n',
-          fontSize=14
-      )
-      .encode(
-          x='yearmonth(진료일자):O',
-          y='growth_rate:Q',
-          text='count_label:N'
-      )
-)
-
-# 막대 + 레이블 합성
-final_month_bar = month_bar + label_rate + label_count
-
-# st.subheader("월간 성장률")
-# st.altair_chart(month_bar, use_container_width=True)
+        # 월간 성장률 차트 (막대 + 레이블)
+        st.altair_chart(growth_chart(monthly), use_container_width=True)
 
 # 두 차트를 같은 행에 배치
 col1, col2 = st.columns(2)
-
 with col1:
-    st.subheader("전년 동기 내원 추이 비교")
-    st.altair_chart(final_comp_chart, use_container_width=True)
-
+    yoy_section()
 with col2:
-    st.subheader("월간 성장률")
-    st.altair_chart(final_month_bar, use_container_width=True)
+    growth_section()
 
 # 7) 요일×시간대 히트맵
-st.subheader("요일×시간대 내원 패턴")
-filtered['요일'] = filtered['진료일자'].dt.day_name()
-heat = filtered.groupby(['요일', '진료시간대']).size().reset_index(name='count')
-heat_chart = alt.Chart(heat).mark_rect().encode(
-    x=alt.X('진료시간대:O', title="시간대", axis=alt.Axis(labelAngle=0)),
-    y=alt.Y('요일:O', sort=['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']),
-    color=alt.Color('count:Q', scale=alt.Scale(scheme='blues'), title='내원수')
-)
-st.altair_chart(heat_chart, use_container_width=True)
-
-# 7) 환자 지도 분포
-st.subheader("환자 지도 분포")
-m = folium.Map(location=[37.5665, 126.9780], zoom_start=7)
-filtered['x'].replace("", pd.NA, inplace=True)
-filtered['y'].replace("", pd.NA, inplace=True)
-data = list(filtered.dropna(subset=['y','x'])[['y','x']].itertuples(index=False, name=None))
-FastMarkerCluster(data).add_to(m)
-folium_static(m, width=800, height=600)
+@st.fragment
+def heatmap_section():
+    with section_run("환자정보: 히트맵"), stage("7) 요일×시간대 히트맵") as s:
+        st.subheader("요일×시간대 내원 패턴")
+        if not st.toggle("보기", value=True, key="show_heatmap"):
+            return
+        heat = memo.get(
+            ('heat',) + filters,
+            lambda: engine.weekday_hour_counts(start_date, end_date, age_band, gender) if engine is not None
+            else weekday_hour_counts(part())
+        )
+        s.rows_out = len(heat)
+        heat_chart = alt.Chart(heat).mark_rect().encode(
+            x=alt.X('진료시간대:O', title="시간대", axis=alt.Axis(labelAngle=0)),
+            y=alt.Y('요일:O', sort=['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']),
+            color=alt.Color('count:Q', scale=alt.Scale(scheme='blues'), title='내원수')
+        )
+        st.altair_chart(heat_chart, use_container_width=True)
+
+heatmap_section()
+
+# 8) 환자 지도 분포
+# 지도 데이터도 결과 캐시에 (환자별 좌표 1개로 중복 제거)
+def map_points():
+    if unfiltered:
+        return patients.points()
+    return memo.get(
+        ('map_points',) + filters,
+        lambda: engine.points(start_date, end_date, age_band, gender) if engine is not None
+        else patient_points(df, visit_rows(df, start_date, end_date, age_band, gender))
+    )
+
+def map_cells(zoom):
+    # 격자 칸 수만큼만 브라우저로 보냄
+    return memo.get(('map_cells',) + filters + (zoom,), lambda: grid_cells(map_points(), zoom))
+
+@st.fragment
+def map_section():
+    with section_run("환자정보: 지도"), stage("8) 환자 지도 분포") as s:
+        st.subheader("환자 지도 분포")
+        # 가장 무거운 구간이라 기본은 꺼 둠 (켜야 좌표 집계와 지도 HTML 을 만든다)
+        if not st.toggle("보기", value=False, key="show_map"):
+            return
+        map_mode = st.radio("표시 방식", ["격자 집계", "마커 클러스터"], horizontal=True)
+        m = folium.Map(location=[37.5665, 126.9780], zoom_start=7)
+        if map_mode == "격자 집계":
+            zoom = st.select_slider("격자 해상도 (줌 레벨)", options=list(range(6, 15)), value=10)
+            cells = map_cells(zoom)
+            max_count = cells['count'].max() if len(cells) else 1
+            for lat, lon, count in cells.itertuples(index=False, name=None):
+                folium.CircleMarker(
+                    [lat, lon],
+                    radius=4 + 16 * (count / max_count) ** 0.5,
+                    weight=0, fill=True, fill_color='#0072C3', fill_opacity=0.6,
+                    tooltip=f"{count:,}명"
+                ).add_to(m)
+            st.caption(f"격자 {len(cells):,}칸 · 환자 {int(cells['count'].sum()):,}명")
+            s.rows_out = len(cells)
+        else:
+            points = map_points()
+            # float32 좌표는 JSON 직렬화가 안 되므로 float64 로
+            locations = list(points.astype(float).itertuples(index=False, name=None))
+            FastMarkerCluster(locations).add_to(m)
+            s.rows_out = len(locations)
+        folium_static(m, width=800, height=600)
+
+map_section()
+
+perf_panel(data.build_run, stats={"결과 캐시": memo.stats()})